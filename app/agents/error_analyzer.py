@@ -1,12 +1,20 @@
 """Error Analyzer agent.
-- Always returns a strict JSON via structured output (Pydantic).
+- Always returns a strict JSON via JSON mode (response_format=json_object) + Pydantic validation.
+- LangChain structured-output 래퍼 없이 Azure OpenAI SDK를 직접 호출(스키마 boilerplate 토큰/후처리 오버헤드 제거)
+- SDK 클라이언트는 common.clients의 공유 커넥션 풀 사용(TCP/TLS 재사용)
+- 잘 알려진 ORA 코드 + 검색 문맥이 빈약하면 패턴 테이블(ora_table)에서 즉시 반환(LLM 호출 생략)
 - Output: {"causes": [str, ...], "notes": str}
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import orjson
 from pydantic import BaseModel, Field  # 입력 데이터를 “검증된 형태의 객체”로 바꿔주는 도구
-from langchain_openai import AzureChatOpenAI # LLM(대형 언어 모델)을 “조립해서 응용”하기 위한 파이썬 프레임워크
-from langchain_core.messages import SystemMessage, HumanMessage # “대화 메시지(Message)” 구조를 정의하는 핵심 모듈
-from ..settings import AOAI_ENDPOINT, AOAI_API_KEY, AOAI_DEPLOY_GPT4O, AZURE_OPENAI_API_VERSION
+from ..settings import AOAI_DEPLOY_GPT4O
+from ..common.clients import get_aoai_client, get_async_aoai_client
+from ..common.patterns import find_ora_code
+from .ora_table import lookup_canned
+
+# 검색 문맥이 이 길이 미만이면 "빈약"으로 보고 패턴 테이블 우선
+_THIN_CONTEXT_CHARS = 300
 
 # 클래스 정의: CausesModel — 데이터/동작을 묶는 청사진
 class CausesModel(BaseModel):
@@ -31,6 +39,52 @@ def _sys_prompt(locale: str) -> str:
         "Write in English."
     )
 
+# 요청 파라미터 구성 — temperature 낮게 + JSON 모드 강제
+def _request(model: str, user_input: str, retrieved_context: str, locale: str) -> Dict[str, Any]:
+    return {
+        "model": model or AOAI_DEPLOY_GPT4O,
+        "temperature": 0.0,
+        "response_format": {"type": "json_object"},
+        "messages": [
+            {"role": "system", "content": _sys_prompt(locale)},
+            {"role": "user", "content": (
+                "User error:\n"
+                f"{user_input}\n\n"
+                "Retrieved Oracle snippets (may be empty):\n"
+                f"{retrieved_context or ''}\n"  # supervisor가 토큰 수 기준으로 이미 절단
+            )},
+        ],
+    }
+
+# 응답 본문(JSON 문자열)을 파싱·검증하는 함수
+def _parse(resp) -> Dict[str, Any]:
+    data = orjson.loads(resp.choices[0].message.content or "{}")
+    return CausesModel.model_validate(data).model_dump()
+
+# 알려진 ORA 코드 + 빈약한 문맥이면 미리 정리된 원인을 반환하는 함수 (아니면 None → LLM 호출)
+def _fast_path(user_input: str, retrieved_context: str, locale: str) -> Optional[Dict[str, Any]]:
+    if len((retrieved_context or "").strip()) >= _THIN_CONTEXT_CHARS:
+        return None
+    code = find_ora_code(user_input)
+    return lookup_canned(code, locale) if code else None
+
+# 빈 결과일 때 최소 힌트라도 제공
+def _finalize(data: Dict[str, Any], user_input: str, locale: str) -> Dict[str, Any]:
+    if not data.get("causes"):
+        code = find_ora_code(user_input)
+        if code:
+            if locale == "ko":
+                data["causes"] = [f"{code} 오류가 발생했습니다. 문서의 네트워크/인증 설정을 확인하세요."]
+                data.setdefault("notes", "로컬 문맥에서 강한 근거를 찾지 못해 일반 힌트를 제시했습니다.")
+            else:
+                data["causes"] = [f"{code} occurred. Check sqlnet/auth settings and network per docs."]
+                data.setdefault("notes", "No strong evidence in retrieved context; using generic hint.")
+    return data
+
+# LLM 호출/파싱 실패 표식 (_finalize가 일반 힌트를 채워도 notes로 실패 여부를 판별할 수 있게 유지)
+PARSE_FAILED_NOTE = "Parser failed; please refine input or context."
+_PARSE_FAILED = {"causes": [], "notes": PARSE_FAILED_NOTE}
+
 def run(
     model: str,
     user_input: str,
@@ -39,41 +93,30 @@ def run(
     strict: bool = True,
     locale: str = "en",  # 🔹 추가: 'ko'이면 한국어 설명
 ) -> Dict[str, Any]:
-    # temperature 낮게 + JSON 강제
-    llm = AzureChatOpenAI(
-        azure_endpoint=AOAI_ENDPOINT,
-        api_key=AOAI_API_KEY,
-        model=model or AOAI_DEPLOY_GPT4O,
-        api_version=AZURE_OPENAI_API_VERSION,
-        temperature=0.0,
-    )
-    structured = llm.with_structured_output(CausesModel)
-
-    msgs = [
-        SystemMessage(content=_sys_prompt(locale)),
-        HumanMessage(content=(
-            "User error:\n"
-            f"{user_input}\n\n"
-            "Retrieved Oracle snippets (may be empty):\n"
-            f"{(retrieved_context or '')[:8000]}\n"
-        ))
-    ]
-
+    """동기 버전 (Streamlit/스크립트용)."""
+    canned = _fast_path(user_input, retrieved_context, locale)
+    if canned is not None:
+        return canned
     try:
-        obj: CausesModel = structured.invoke(msgs)
-        data = obj.model_dump()
+        data = _parse(get_aoai_client().chat.completions.create(**_request(model, user_input, retrieved_context, locale)))
     except Exception:
-        data = {"causes": [], "notes": "Parser failed; please refine input or context."}
+        data = dict(_PARSE_FAILED)
+    return _finalize(data, user_input, locale)
 
-    # 빈 결과일 때 최소 힌트라도 제공
-    if not data.get("causes"):
-        import re
-        m = re.findall(r"(ORA-\d{5})", user_input or "")
-        if m:
-            if locale == "ko":
-                data["causes"] = [f"{m[0]} 오류가 발생했습니다. 문서의 네트워크/인증 설정을 확인하세요."]
-                data.setdefault("notes", "로컬 문맥에서 강한 근거를 찾지 못해 일반 힌트를 제시했습니다.")
-            else:
-                data["causes"] = [f"{m[0]} occurred. Check sqlnet/auth settings and network per docs."]
-                data.setdefault("notes", "No strong evidence in retrieved context; using generic hint.")
-    return data
+async def arun(
+    model: str,
+    user_input: str,
+    retrieved_context: str,
+    *,
+    strict: bool = True,
+    locale: str = "en",
+) -> Dict[str, Any]:
+    """비동기 버전 — 이벤트 루프를 막지 않고 웹 검색과 병렬 실행 가능."""
+    canned = _fast_path(user_input, retrieved_context, locale)
+    if canned is not None:
+        return canned
+    try:
+        data = _parse(await get_async_aoai_client().chat.completions.create(**_request(model, user_input, retrieved_context, locale)))
+    except Exception:
+        data = dict(_PARSE_FAILED)
+    return _finalize(data, user_input, locale)
@@ -0,0 +1,313 @@
+# app/agents/ora_table.py
+"""
+자주 발생하는 Oracle 오류의 원인 패턴 테이블 (error_analyzer fast path).
+- 원인이 명확한 상위 ORA 코드는 LLM 호출 없이 미리 정리된 원인을 반환
+- 형식: ORA_CANNED[code][locale] = [원인 문장, ...]  (locale: "en" | "ko")
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+
+ORA_CANNED: Dict[str, Dict[str, List[str]]] = {
+    "ORA-00001": {
+        "en": ["An INSERT or UPDATE produced a duplicate value for a column protected by a unique constraint or unique index.",
+               "A sequence or application-generated key is out of sync with the existing data."],
+        "ko": ["INSERT/UPDATE가 고유 제약조건(또는 고유 인덱스)이 걸린 컬럼에 중복 값을 만들었습니다.",
+               "시퀀스 또는 애플리케이션이 생성한 키 값이 기존 데이터와 어긋났습니다."],
+    },
+    "ORA-00018": {
+        "en": ["The number of sessions reached the SESSIONS initialization parameter limit.",
+               "Connection leaks or an undersized connection pool configuration are exhausting sessions."],
+        "ko": ["세션 수가 SESSIONS 초기화 파라미터 한도에 도달했습니다.",
+               "커넥션 누수 또는 커넥션 풀 설정 문제로 세션이 고갈되었습니다."],
+    },
+    "ORA-00020": {
+        "en": ["The number of OS processes reached the PROCESSES initialization parameter limit.",
+               "Too many dedicated server connections or background jobs are running at once."],
+        "ko": ["프로세스 수가 PROCESSES 초기화 파라미터 한도에 도달했습니다.",
+               "전용 서버 연결 또는 백그라운드 작업이 동시에 너무 많이 실행 중입니다."],
+    },
+    "ORA-00028": {
+        "en": ["The session was terminated by ALTER SYSTEM KILL SESSION or by a resource-manager/idle-time limit."],
+        "ko": ["ALTER SYSTEM KILL SESSION 또는 리소스 매니저/유휴 시간 제한으로 세션이 종료되었습니다."],
+    },
+    "ORA-00054": {
+        "en": ["The requested object is locked by another session (row or DDL lock) and NOWAIT or DDL_LOCK_TIMEOUT expired.",
+               "An uncommitted transaction in another session holds the lock."],
+        "ko": ["다른 세션이 대상 객체에 락(행/DDL 락)을 잡고 있어 NOWAIT 또는 DDL_LOCK_TIMEOUT이 만료되었습니다.",
+               "다른 세션의 커밋되지 않은 트랜잭션이 락을 보유하고 있습니다."],
+    },
+    "ORA-00060": {
+        "en": ["Two or more sessions are waiting on rows locked by each other (application-level deadlock).",
+               "Inconsistent row/table access order or unindexed foreign keys commonly cause it."],
+        "ko": ["두 개 이상의 세션이 서로가 잠근 행을 기다리는 교착 상태(애플리케이션 수준 데드락)입니다.",
+               "행/테이블 접근 순서 불일치나 인덱스 없는 외래키가 흔한 원인입니다."],
+    },
+    "ORA-00257": {
+        "en": ["The archiver cannot write archived redo logs, usually because the archive destination or FRA is full.",
+               "Until space is freed, only SYSDBA connections are allowed."],
+        "ko": ["아카이브 대상(또는 FRA) 공간 부족 등으로 아카이버가 아카이브 로그를 기록하지 못하고 있습니다.",
+               "공간이 확보될 때까지 SYSDBA 접속만 허용됩니다."],
+    },
+    "ORA-00600": {
+        "en": ["An internal Oracle code check failed (often a bug or corruption); the first argument identifies the failing module.",
+               "Check the alert log/trace file and search My Oracle Support with the ORA-600 arguments."],
+        "ko": ["Oracle 내부 검사 실패(버그/손상 등)이며 첫 번째 인자가 실패 모듈을 나타냅니다.",
+               "alert 로그/트레이스 파일을 확인하고 ORA-600 인자로 My Oracle Support를 검색하세요."],
+    },
+    "ORA-00604": {
+        "en": ["An error occurred while Oracle executed recursive (internal dictionary) SQL; the following error in the stack is the real cause."],
+        "ko": ["내부 재귀 SQL(딕셔너리 조회 등) 실행 중 오류가 발생했으며, 스택의 다음 오류가 실제 원인입니다."],
+    },
+    "ORA-00900": {
+        "en": ["The statement is not valid SQL or PL/SQL (typo, unsupported command, or a client-side command sent to the server)."],
+        "ko": ["유효하지 않은 SQL/PLSQL 문장입니다(오타, 미지원 명령, 클라이언트 전용 명령을 서버에 전송 등)."],
+    },
+    "ORA-00904": {
+        "en": ["A column name or alias in the statement does not exist or is misspelled.",
+               "Quoted identifiers are case-sensitive, or the column is referenced outside its scope."],
+        "ko": ["문장에 사용한 컬럼명/별칭이 존재하지 않거나 철자가 잘못되었습니다.",
+               "큰따옴표 식별자의 대소문자 불일치 또는 범위 밖에서 컬럼을 참조했습니다."],
+    },
+    "ORA-00907": {
+        "en": ["The SQL has unbalanced parentheses or invalid syntax inside a parenthesized clause."],
+        "ko": ["괄호 짝이 맞지 않거나 괄호 안 구문이 잘못되었습니다."],
+    },
+    "ORA-00911": {
+        "en": ["The statement contains an invalid character, often a trailing semicolon sent through a driver or a non-ASCII character."],
+        "ko": ["문장에 잘못된 문자가 포함되었습니다(드라이버로 보낸 끝의 세미콜론, 비ASCII 문자 등)."],
+    },
+    "ORA-00913": {
+        "en": ["The INSERT or subquery supplies more values than the target column list."],
+        "ko": ["INSERT 또는 서브쿼리가 대상 컬럼 수보다 많은 값을 제공합니다."],
+    },
+    "ORA-00917": {
+        "en": ["A comma is missing in a column or value list."],
+        "ko": ["컬럼 목록 또는 VALUES 목록에 쉼표가 누락되었습니다."],
+    },
+    "ORA-00918": {
+        "en": ["A column name used in a join exists in more than one table and is not qualified with a table alias."],
+        "ko": ["조인 대상 여러 테이블에 같은 이름의 컬럼이 있는데 테이블 별칭 없이 참조했습니다."],
+    },
+    "ORA-00920": {
+        "en": ["A WHERE/HAVING condition has a missing or invalid relational operator."],
+        "ko": ["WHERE/HAVING 조건에 관계 연산자가 없거나 잘못되었습니다."],
+    },
+    "ORA-00921": {
+        "en": ["The SQL statement ended before it was complete (truncated or incomplete command)."],
+        "ko": ["SQL 문장이 완성되기 전에 끝났습니다(잘린 문장 또는 미완성 명령)."],
+    },
+    "ORA-00923": {
+        "en": ["The FROM keyword is missing or misplaced, often due to a bad column alias or missing comma in the SELECT list."],
+        "ko": ["FROM 키워드가 없거나 위치가 잘못되었습니다(SELECT 목록의 별칭 오류나 쉼표 누락 등)."],
+    },
+    "ORA-00932": {
+        "en": ["An expression compares or combines incompatible datatypes (e.g. CLOB in comparison, DATE vs NUMBER)."],
+        "ko": ["호환되지 않는 데이터 타입끼리 비교/연산했습니다(예: CLOB 비교, DATE와 NUMBER)."],
+    },
+    "ORA-00933": {
+        "en": ["The SQL statement has an invalid clause or trailing text (e.g. ORDER BY in INSERT ... SELECT subquery, extra keyword)."],
+        "ko": ["SQL 문장 끝에 잘못된 절이나 불필요한 텍스트가 있습니다(예: 서브쿼리 내 ORDER BY, 불필요한 키워드)."],
+    },
+    "ORA-00936": {
+        "en": ["A required expression is missing, e.g. an empty SELECT list item, a dangling operator, or a missing value."],
+        "ko": ["필요한 표현식이 누락되었습니다(빈 SELECT 항목, 피연산자 없는 연산자, 값 누락 등)."],
+    },
+    "ORA-00937": {
+        "en": ["The SELECT list mixes aggregate functions with non-aggregated columns without a GROUP BY."],
+        "ko": ["GROUP BY 없이 집계 함수와 비집계 컬럼을 SELECT 목록에 함께 사용했습니다."],
+    },
+    "ORA-00942": {
+        "en": ["The table or view does not exist in the referenced schema, or the name is misspelled.",
+               "The current user lacks privileges on the object, or a synonym/schema prefix is missing."],
+        "ko": ["참조한 스키마에 테이블/뷰가 존재하지 않거나 이름이 잘못되었습니다.",
+               "현재 사용자에게 객체 권한이 없거나 동의어/스키마 접두어가 누락되었습니다."],
+    },
+    "ORA-00947": {
+        "en": ["The INSERT or subquery supplies fewer values than the target column list."],
+        "ko": ["INSERT 또는 서브쿼리가 대상 컬럼 수보다 적은 값을 제공합니다."],
+    },
+    "ORA-00955": {
+        "en": ["An object with the same name already exists in the schema namespace (table, view, index, sequence, synonym, etc.)."],
+        "ko": ["같은 네임스페이스에 동일한 이름의 객체(테이블/뷰/인덱스/시퀀스/동의어 등)가 이미 존재합니다."],
+    },
+    "ORA-00979": {
+        "en": ["A SELECT-list or ORDER BY expression is not included in the GROUP BY clause."],
+        "ko": ["SELECT 목록 또는 ORDER BY 표현식이 GROUP BY 절에 포함되지 않았습니다."],
+    },
+    "ORA-01000": {
+        "en": ["A session opened more cursors than OPEN_CURSORS allows.",
+               "The application is not closing statements/result sets (cursor leak)."],
+        "ko": ["세션이 OPEN_CURSORS 한도보다 많은 커서를 열었습니다.",
+               "애플리케이션이 Statement/ResultSet을 닫지 않고 있습니다(커서 누수)."],
+    },
+    "ORA-01017": {
+        "en": ["The username or password is incorrect (case-sensitive passwords, wrong database/PDB).",
+               "Password file or authentication settings (SEC_CASE_SENSITIVE_LOGON, sqlnet.ora) do not match the client."],
+        "ko": ["사용자명 또는 비밀번호가 올바르지 않습니다(대소문자 구분, 다른 DB/PDB 접속).",
+               "패스워드 파일 또는 인증 설정(SEC_CASE_SENSITIVE_LOGON, sqlnet.ora)이 클라이언트와 맞지 않습니다."],
+    },
+    "ORA-01031": {
+        "en": ["The user lacks the system or object privilege required for the operation.",
+               "Privileges granted through a role are not active in definer-rights PL/SQL or for SYSDBA OS authentication."],
+        "ko": ["작업에 필요한 시스템/객체 권한이 사용자에게 없습니다.",
+               "롤로 받은 권한은 정의자 권한 PL/SQL이나 SYSDBA OS 인증에서 적용되지 않습니다."],
+    },
+    "ORA-01033": {
+        "en": ["The instance is starting up or shutting down, so normal connections are not yet accepted."],
+        "ko": ["인스턴스가 기동 또는 종료 중이어서 일반 접속을 받을 수 없습니다."],
+    },
+    "ORA-01034": {
+        "en": ["The Oracle instance is not started, or the client connects with the wrong ORACLE_SID/ORACLE_HOME."],
+        "ko": ["Oracle 인스턴스가 기동되지 않았거나 잘못된 ORACLE_SID/ORACLE_HOME으로 접속했습니다."],
+    },
+    "ORA-01045": {
+        "en": ["The user does not have the CREATE SESSION privilege, so logon is denied."],
+        "ko": ["사용자에게 CREATE SESSION 권한이 없어 로그인이 거부되었습니다."],
+    },
+    "ORA-01400": {
+        "en": ["An INSERT or UPDATE attempted to put NULL into a NOT NULL column."],
+        "ko": ["INSERT/UPDATE가 NOT NULL 컬럼에 NULL을 넣으려 했습니다."],
+    },
+    "ORA-01403": {
+        "en": ["A SELECT INTO in PL/SQL returned no rows, or an uninitialized associative array element was referenced."],
+        "ko": ["PL/SQL의 SELECT INTO가 0건을 반환했거나 초기화되지 않은 연관 배열 요소를 참조했습니다."],
+    },
+    "ORA-01422": {
+        "en": ["A SELECT INTO in PL/SQL returned more than one row."],
+        "ko": ["PL/SQL의 SELECT INTO가 2건 이상을 반환했습니다."],
+    },
+    "ORA-01427": {
+        "en": ["A subquery used as a single value (e.g. with =) returned more than one row."],
+        "ko": ["단일 값으로 사용된 서브쿼리(예: = 비교)가 2건 이상을 반환했습니다."],
+    },
+    "ORA-01438": {
+        "en": ["A numeric value exceeds the precision/scale defined for the NUMBER column."],
+        "ko": ["숫자 값이 NUMBER 컬럼에 정의된 정밀도/스케일을 초과했습니다."],
+    },
+    "ORA-01476": {
+        "en": ["An expression divided a number by zero."],
+        "ko": ["표현식에서 0으로 나누었습니다."],
+    },
+    "ORA-01555": {
+        "en": ["Undo needed for a consistent read was overwritten before a long-running query finished.",
+               "UNDO_RETENTION or the undo tablespace is too small, or frequent commits occur inside a fetch loop."],
+        "ko": ["장시간 쿼리가 끝나기 전에 일관성 읽기에 필요한 UNDO가 덮어써졌습니다.",
+               "UNDO_RETENTION/UNDO 테이블스페이스가 부족하거나 fetch 루프 안에서 잦은 커밋이 발생합니다."],
+    },
+    "ORA-01652": {
+        "en": ["The temporary tablespace has no free space for sort/hash operations.",
+               "A large sort, hash join, or runaway query is consuming TEMP."],
+        "ko": ["정렬/해시 작업에 필요한 임시 테이블스페이스 공간이 부족합니다.",
+               "대용량 정렬, 해시 조인 또는 비정상 쿼리가 TEMP를 과도하게 사용하고 있습니다."],
+    },
+    "ORA-01653": {
+        "en": ["The tablespace holding the table has no free space and its datafiles cannot autoextend further."],
+        "ko": ["테이블이 속한 테이블스페이스에 여유 공간이 없고 데이터파일이 더 이상 자동 확장되지 않습니다."],
+    },
+    "ORA-01722": {
+        "en": ["A character string that is not a valid number was implicitly or explicitly converted to NUMBER."],
+        "ko": ["숫자가 아닌 문자열을 NUMBER로 (암시적/명시적) 변환하려 했습니다."],
+    },
+    "ORA-01843": {
+        "en": ["A date string does not match the format mask or NLS_DATE_LANGUAGE (invalid month)."],
+        "ko": ["날짜 문자열이 포맷 마스크 또는 NLS_DATE_LANGUAGE와 맞지 않습니다(잘못된 월)."],
+    },
+    "ORA-01950": {
+        "en": ["The user has no quota on the target tablespace."],
+        "ko": ["사용자에게 대상 테이블스페이스에 대한 QUOTA가 없습니다."],
+    },
+    "ORA-02291": {
+        "en": ["The foreign key value being inserted/updated has no matching parent key."],
+        "ko": ["INSERT/UPDATE하는 외래키 값에 대응하는 부모 키가 없습니다."],
+    },
+    "ORA-02292": {
+        "en": ["The parent row being deleted/updated still has dependent child rows."],
+        "ko": ["삭제/수정하려는 부모 행을 참조하는 자식 행이 남아 있습니다."],
+    },
+    "ORA-04030": {
+        "en": ["A server process ran out of private (PGA/OS) memory, often due to large in-memory collections or OS limits."],
+        "ko": ["서버 프로세스의 개인 메모리(PGA/OS)가 부족합니다(대용량 컬렉션, OS 한도 등)."],
+    },
+    "ORA-04031": {
+        "en": ["The shared pool (or large/java pool) cannot allocate a contiguous chunk of memory.",
+               "Shared pool fragmentation from non-shared (literal) SQL or an undersized SGA."],
+        "ko": ["공유 풀(또는 large/java pool)에서 연속 메모리를 할당하지 못했습니다.",
+               "바인드 변수 미사용 SQL로 인한 공유 풀 단편화 또는 SGA 크기 부족입니다."],
+    },
+    "ORA-04091": {
+        "en": ["A row-level trigger queries or modifies the table that fired it (mutating table)."],
+        "ko": ["행 수준 트리거가 자신을 발생시킨 테이블을 조회/수정했습니다(mutating table)."],
+    },
+    "ORA-06502": {
+        "en": ["A PL/SQL assignment or conversion failed: value too large for the variable, or invalid character-to-number conversion."],
+        "ko": ["PL/SQL 대입/변환 실패입니다: 변수 크기 초과 또는 잘못된 문자→숫자 변환."],
+    },
+    "ORA-06550": {
+        "en": ["The PL/SQL block failed to compile; the accompanying PLS- error gives the line, column and reason."],
+        "ko": ["PL/SQL 블록 컴파일 오류이며, 함께 표시된 PLS- 오류에 줄/열/원인이 있습니다."],
+    },
+    "ORA-12154": {
+        "en": ["The connect identifier cannot be resolved: the alias is missing from tnsnames.ora or the wrong TNS_ADMIN is used.",
+               "sqlnet.ora NAMES.DIRECTORY_PATH or EZCONNECT syntax does not match the identifier."],
+        "ko": ["접속 식별자를 해석할 수 없습니다: tnsnames.ora에 별칭이 없거나 다른 TNS_ADMIN을 사용 중입니다.",
+               "sqlnet.ora의 NAMES.DIRECTORY_PATH 또는 EZCONNECT 구문이 식별자와 맞지 않습니다."],
+    },
+    "ORA-12170": {
+        "en": ["The connection attempt timed out: host unreachable, firewall blocking the listener port, or network latency."],
+        "ko": ["접속 시도가 시간 초과되었습니다: 호스트 접근 불가, 방화벽의 리스너 포트 차단, 네트워크 지연 등."],
+    },
+    "ORA-12505": {
+        "en": ["The listener does not know the SID in the connect descriptor (wrong SID, or instance not registered)."],
+        "ko": ["리스너가 접속 디스크립터의 SID를 알지 못합니다(잘못된 SID 또는 인스턴스 미등록)."],
+    },
+    "ORA-12514": {
+        "en": ["The listener does not know the SERVICE_NAME in the connect descriptor.",
+               "The instance/PDB is down or has not registered the service (LOCAL_LISTENER, dynamic registration)."],
+        "ko": ["리스너가 접속 디스크립터의 SERVICE_NAME을 알지 못합니다.",
+               "인스턴스/PDB가 내려갔거나 서비스가 리스너에 등록되지 않았습니다(LOCAL_LISTENER, 동적 등록)."],
+    },
+    "ORA-12516": {
+        "en": ["The listener found no available handler: the instance reached its PROCESSES/SESSIONS limit or is blocking connections."],
+        "ko": ["리스너가 사용 가능한 핸들러를 찾지 못했습니다: 인스턴스의 PROCESSES/SESSIONS 한도 도달 또는 접속 차단 상태입니다."],
+    },
+    "ORA-12519": {
+        "en": ["No appropriate service handler was found, typically because PROCESSES is exhausted or registration is stale."],
+        "ko": ["적절한 서비스 핸들러가 없습니다(주로 PROCESSES 고갈 또는 서비스 등록 정보 지연)."],
+    },
+    "ORA-12541": {
+        "en": ["No listener is running on the target host/port, or the HOST/PORT in the connect descriptor is wrong.",
+               "A firewall or network path blocks the listener port."],
+        "ko": ["대상 호스트/포트에서 리스너가 실행 중이 아니거나 접속 디스크립터의 HOST/PORT가 잘못되었습니다.",
+               "방화벽 또는 네트워크 경로가 리스너 포트를 차단하고 있습니다."],
+    },
+    "ORA-12560": {
+        "en": ["The protocol adapter failed, commonly an unset/wrong ORACLE_SID or a stopped Windows OracleService."],
+        "ko": ["프로토콜 어댑터 오류이며, 보통 ORACLE_SID 미설정/오류 또는 Windows OracleService 중지가 원인입니다."],
+    },
+    "ORA-12899": {
+        "en": ["The value is longer than the column's maximum length (check byte vs character semantics for multibyte data)."],
+        "ko": ["값이 컬럼 최대 길이를 초과했습니다(멀티바이트 데이터는 BYTE/CHAR 길이 의미 확인)."],
+    },
+    "ORA-28000": {
+        "en": ["The account is locked, usually after exceeding FAILED_LOGIN_ATTEMPTS in its profile or by an explicit ACCOUNT LOCK."],
+        "ko": ["계정이 잠겼습니다(프로파일의 FAILED_LOGIN_ATTEMPTS 초과 또는 명시적 ACCOUNT LOCK)."],
+    },
+    "ORA-28001": {
+        "en": ["The password has expired per the profile's PASSWORD_LIFE_TIME."],
+        "ko": ["프로파일의 PASSWORD_LIFE_TIME에 따라 비밀번호가 만료되었습니다."],
+    },
+    "ORA-65096": {
+        "en": ["In a CDB root, common user/role names must start with the COMMON_USER_PREFIX (default C##); local users must be created in a PDB."],
+        "ko": ["CDB 루트에서는 공통 사용자/롤 이름이 COMMON_USER_PREFIX(기본 C##)로 시작해야 하며, 로컬 사용자는 PDB에서 생성해야 합니다."],
+    },
+}
+
+# ORA 코드 + locale로 미리 정리된 원인(dict)을 반환하는 함수 (없으면 None)
+def lookup_canned(code: Optional[str], locale: str) -> Optional[Dict[str, Any]]:
+    entry = ORA_CANNED.get((code or "").upper())
+    if not entry:
+        return None
+    causes = entry.get("ko" if locale == "ko" else "en") or entry.get("en") or []
+    return {"causes": list(causes), "notes": "pattern-table"}
+
+__all__ = ["ORA_CANNED", "lookup_canned"]
@@ -1,8 +1,8 @@
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Tuple
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import AzureChatOpenAI
 from ..settings import AOAI_ENDPOINT, AOAI_API_KEY, AOAI_DEPLOY_GPT4O, AZURE_OPENAI_API_VERSION
-import re  # 정규표현식(Regular Expression) 기능을 사용하기 위한 표준 라이브러리를 불러오는 코드
+from ..common.clients import get_http_client, get_async_http_client, loop_cache
 
 STRICT_PROMPT_EN = (
     "Use ONLY local context tags [R#]. Write concise, step-by-step guidance. "
@@ -41,23 +41,34 @@ def _strip_unreferenced_lines(md: str) -> str:
     # 필요시 [R#]/[W#] 미포함 줄 제거 로직을 여기에 추가
     return md
 
-def run(
-    model: str,
+# (model, temperature) → AzureChatOpenAI. 동기용은 프로세스 전역, 비동기용은 이벤트 루프별로 재사용
+_LLM_CACHE: Dict[Tuple[str, float], AzureChatOpenAI] = {}
+
+def _build_llm(model: str, strict: bool, web_context: str, *, is_async: bool = False) -> AzureChatOpenAI:
+    temperature = 0.1 if (strict and not web_context) else 0.2
+    key = (model or AOAI_DEPLOY_GPT4O, temperature)
+    cache = loop_cache() if is_async else _LLM_CACHE
+    llm = cache.get(key)
+    if llm is None:
+        llm = cache[key] = AzureChatOpenAI(
+            azure_endpoint=AOAI_ENDPOINT,
+            api_key=AOAI_API_KEY,
+            model=key[0],
+            api_version=AZURE_OPENAI_API_VERSION,
+            temperature=temperature,
+            http_client=get_http_client(),  # 공유 커넥션 풀 (TCP/TLS 재사용)
+            http_async_client=get_async_http_client() if is_async else None,
+        )
+    return llm
+
+def _build_messages(
     user_input: str,
     causes_json: Dict[str, Any],
     retrieved_context: str,
-    *,
-    strict: bool = True,
-    web_context: str = "",
-    locale: str = "en",  # 🔹 추가: 'ko'이면 한국어 본문
-) -> str:
-    llm = AzureChatOpenAI(
-        azure_endpoint=AOAI_ENDPOINT,
-        api_key=AOAI_API_KEY,
-        model=model or AOAI_DEPLOY_GPT4O,
-        api_version=AZURE_OPENAI_API_VERSION,
-        temperature=0.1 if (strict and not web_context) else 0.2,
-    )
+    strict: bool,
+    web_context: str,
+    locale: str,
+) -> list:
     system_prompt = _system_prompt(strict, bool(web_context), locale)
 
     ctx = f"Local context:\n{retrieved_context or '(empty)'}\n"
@@ -67,7 +78,7 @@ def run(
     # 🔸 결과 언어 보장 문구(추가 안전장치)
     lang_hint = "모든 본문은 반드시 한국어로 작성하세요." if locale == "ko" else "Write the entire answer in English."
 
-    msgs = [
+    return [
         SystemMessage(content=system_prompt),
         HumanMessage(content=(
             f"{lang_hint}\n\n"
@@ -79,6 +90,54 @@ def run(
             "Every action/verification bullet MUST end with its evidence tag like [R1] or [W1]."
         )),
     ]
+
+def run(
+    model: str,
+    user_input: str,
+    causes_json: Dict[str, Any],
+    retrieved_context: str,
+    *,
+    strict: bool = True,
+    web_context: str = "",
+    locale: str = "en",  # 🔹 추가: 'ko'이면 한국어 본문
+) -> str:
+    llm = _build_llm(model, strict, web_context)
+    msgs = _build_messages(user_input, causes_json, retrieved_context, strict, web_context, locale)
     resp = llm.invoke(msgs)
     md = resp.content or ""
     return _strip_unreferenced_lines(md)
+
+async def arun(
+    model: str,
+    user_input: str,
+    causes_json: Dict[str, Any],
+    retrieved_context: str,
+    *,
+    strict: bool = True,
+    web_context: str = "",
+    locale: str = "en",
+) -> str:
+    """비동기 버전 (FastAPI/병렬 파이프라인용)."""
+    llm = _build_llm(model, strict, web_context, is_async=True)
+    msgs = _build_messages(user_input, causes_json, retrieved_context, strict, web_context, locale)
+    resp = await llm.ainvoke(msgs)
+    md = resp.content or ""
+    return _strip_unreferenced_lines(md)
+
+async def arun_stream(
+    model: str,
+    user_input: str,
+    causes_json: Dict[str, Any],
+    retrieved_context: str,
+    *,
+    strict: bool = True,
+    web_context: str = "",
+    locale: str = "en",
+) -> AsyncIterator[str]:
+    """토큰 스트리밍 버전 — 생성되는 대로 조각(str)을 yield.
+    _strip_unreferenced_lines는 스트림 완료 후 호출측에서 전체 본문에 적용한다."""
+    llm = _build_llm(model, strict, web_context, is_async=True)
+    msgs = _build_messages(user_input, causes_json, retrieved_context, strict, web_context, locale)
+    async for chunk in llm.astream(msgs):
+        if chunk.content:
+            yield chunk.content
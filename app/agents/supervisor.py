@@ -6,14 +6,12 @@ RAG 우선, 실패 시 WEB fallback.
 - 결과: [R#]/[W#] 태그와 Local/Web Sources 함께 반환
 """
 from __future__ import annotations  # 타입 힌트를 문자열로 처리하게 만드는 기능
-from dataclasses import dataclass, field # “데이터 전용 클래스”를 간단하게 정의하기 위한 문법
-from typing import Dict, Any, List, Optional, Tuple 
-from uuid import uuid4 # 고유한 식별자(UUID, Universally Unique Identifier) 를 자동으로 생성하기 위한 코드
-from langgraph.graph import StateGraph, END  # StateGraph : 그래프 기반 워크플로우 객체, END : 그래프 종료 노드의 상수
-from langgraph.checkpoint.memory import MemorySaver # 간단한 인메모리 방식 저장소
-from ..rag.retriever import retrieve
+from dataclasses import dataclass # “데이터 전용 클래스”를 간단하게 정의하기 위한 문법
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Sequence, Tuple 
+from ..rag.batcher import get_batcher
+import asyncio # 노드 비동기 실행(LLM ainvoke + 웹 검색 병렬화)
 import os # 운영체제(OS, Operating System)와 상호작용하기 위한 표준 라이브러리
-import re
+import re # 솔루션 본문의 [R#] 인용/헤딩 검사
 
 # 모델 기본값: 환경변수에서 우선 가져오고, 없으면 빈 문자열로
 MODEL = (
@@ -22,157 +20,215 @@ MODEL = (
     or os.getenv("OPENAI_DEPLOYMENT")
     or ""
 )
-from .error_analyzer import run as run_error_analyzer
-from .solution_writer import run as run_solution_writer
+from .error_analyzer import arun as arun_error_analyzer, PARSE_FAILED_NOTE
+from .solution_writer import arun as arun_solution_writer
+from .solution_writer import arun_stream as arun_solution_stream, _strip_unreferenced_lines
 from ..web.search import search_web_safely
+from ..cache.response_cache import get_response_cache, make_key, manifest_fingerprint, RESPONSE_CACHE_ENABLED
+from ..cache.semantic_cache import get_semantic_cache, bucket_key
+from ..cache.context_cache import get_context_cache, doc_key, doc_sort_key
+from ..common.patterns import find_ora_code
+from ..common.tokens import CONTEXT_MAX_TOKENS, count_tokens, trim_to_tokens
 
 # ---------- State ----------
-@dataclass
+# slots=True: 요청마다 생성되는 state의 __dict__ 제거(속성 접근/메모리 절약).
+# 리스트/딕트 필드는 None으로 지연 초기화 — 읽는 쪽은 None을 빈 값으로 취급한다.
+@dataclass(slots=True)
 class AgentState:
     user_input: str
     db_dir: str
     allow_web: bool = True
+    prefer_ko: bool = True
     # local
     retrieved_text: str = ""
-    references: List[Dict[str, Any]] = field(default_factory=list)
+    # LLM 프롬프트용(토큰 수 기준 1회 절단) — analyze/solution 노드가 공유
+    retrieved_text_trimmed: str = ""
+    references: Optional[Sequence[Dict[str, Any]]] = None
     # analysis
-    causes_json: Dict[str, Any] = field(default_factory=dict)
+    causes_json: Optional[Dict[str, Any]] = None
     solution_markdown: str = ""
     # web
     web_context: str = ""
-    web_refs: List[Dict[str, str]] = field(default_factory=list)
+    web_refs: Optional[Sequence[Dict[str, str]]] = None
     # debug
     web_attempted: bool = False
     web_result_count: int = 0
+    # semantic 캐시용 질의 임베딩(L2 정규화, 1회만 계산해 검색에도 재사용)
+    query_vec: Optional[List[float]] = None
 
 # ---------- Helpers ----------
 # **Oracle 오류 코드(ORA-XXXX 형식)**를 문자열에서 추출하는 함수
 def _extract_ora_code(q: str) -> Optional[str]:
-    m = re.search(r"(ORA-\d{5})", (q or "").upper())
-    return m.group(1) if m else None
+    return find_ora_code(q)
+
+# 문서 메타데이터 키 후보 (로더/버전에 따라 키 이름이 다름)
+_META_KEYS_SOURCE = ("source", "filename", "file", "path")
+_META_KEYS_PAGE = ("page", "pageno", "page_number")
+_BLOCK_SEP = "\n\n---\n\n"
+
+# 문서 1건의 (파일명, 페이지)를 한 번에 추출하는 함수
+def _extract_meta(d) -> Tuple[str, Any]:
+    # ✅ 메타데이터가 없거나 키가 다를 때도 안정적으로 참조 생성
+    meta = getattr(d, "metadata", None) or {}
+    fn = next((meta[k] for k in _META_KEYS_SOURCE if meta.get(k)), "Unknown source")
+    page = next((meta[k] for k in _META_KEYS_PAGE if meta.get(k)), "")
+    return fn, page
 
 # LangGraph를 기반으로 로컬 실행 블록들을 구성하는 함수
-def _build_local_blocks(docs, start_index=1) -> Tuple[str, List[Dict[str, Any]]]:
+def _build_local_blocks(docs, start_index=1, ranks: Optional[Sequence[int]] = None) -> Tuple[str, Tuple[Dict[str, Any], ...]]:
     """
     반환 텍스트는 [R#] 태그를 헤더로 가진 블록들의 합치기.
-    refs: [{"rid":"R1","filename":"...","page":3}, ...]
+    refs: ({"rid":"R1","filename":"...","page":3,"rank":2}, ...)  — 읽기 전용이므로 tuple
+    ranks: 각 문서의 검색 관련도 순위(1=최상위). 블록은 정렬 순서지만 순위는 refs에 보존된다.
     """
-    blocks, refs = [], []
-    for i, d in enumerate(docs, start_index):
-        # ✅ 메타데이터가 없거나 키가 다를 때도 안정적으로 참조 생성
-        meta = getattr(d, "metadata", {}) or {}
-        fn = (
-            meta.get("source")
-            or meta.get("filename")
-            or meta.get("file")
-            or meta.get("path")
-            or "Unknown source"
-        )
-        page = (
-            meta.get("page")
-            or meta.get("pageno")
-            or meta.get("page_number")
-            or ""
-        )
-        header = f"[R{i}] {fn}" + (f" (p.{page})" if str(page).strip() else "")
-        blocks.append(f"{header}\n{d.page_content}")
-        refs.append({"rid": f"R{i}", "filename": fn, "page": page})
-    return ("\n\n---\n\n".join(blocks)), refs
+    metas = tuple(_extract_meta(d) for d in docs)
+    ranks = tuple(ranks) if ranks is not None else tuple(range(1, len(docs) + 1))
+    text = _BLOCK_SEP.join(
+        f"[R{i}] {fn}" + (f" (p.{page})" if str(page).strip() else "") + f"\n{d.page_content}"
+        for i, (d, (fn, page)) in enumerate(zip(docs, metas), start_index)
+    )
+    refs = tuple(
+        {"rid": f"R{i}", "filename": fn, "page": page, "rank": rank}
+        for i, ((fn, page), rank) in enumerate(zip(metas, ranks), start_index)
+    )
+    return text, refs
+
+# [R#] 헤더 + 구분자 몫의 토큰 여유분 (블록 단위 예산 계산용 근사치)
+_BLOCK_OVERHEAD_TOKENS = 32
+
+# 관련도 순서(FAISS)의 문서들 중 CONTEXT_MAX_TOKENS 안에 들어가는 블록만 통째로 고르는 함수
+def _select_within_budget(docs, budget: int = CONTEXT_MAX_TOKENS) -> List[Tuple[int, Any]]:
+    """반환: [(순위, 문서), ...] — 상위 순위부터 채우고, 넘치는 블록은 건너뛴다(중간 절단 없음).
+    최상위 1건은 항상 포함 (그 1건이 예산보다 크면 이후 trim_to_tokens가 잘라냄)."""
+    kept: List[Tuple[int, Any]] = []
+    used = 0
+    for rank, d in enumerate(docs, 1):
+        cost = count_tokens(d.page_content or "") + _BLOCK_OVERHEAD_TOKENS
+        if kept and used + cost > budget:
+            continue
+        kept.append((rank, d))
+        used += cost
+    return kept
 
 # 웹 검색 결과를 포함하는 흐름을 설계하는 함수
-def _build_web_blocks(results: List[Dict[str, str]], start_index=1) -> Tuple[str, List[Dict[str, str]]]:
+def _build_web_blocks(results: List[Dict[str, str]], start_index=1) -> Tuple[str, Tuple[Dict[str, str], ...]]:
     """
     search_web_safely() 결과를 받아 [W#] 블록 텍스트 + UI용 web_refs 생성
     """
-    blocks, refs = [], []
-    idx = start_index
-    for r in results:
-        url = r.get("url") or r.get("href") or ""
-        title = r.get("title") or url
-        body  = r.get("text")  or r.get("content") or r.get("snippet") or ""
-        if not url:
-            continue
-        header = f"[W{idx}] {title}\n{url}"
-        if body:
-            blocks.append(f"{header}\n{body}")
-        else:
-            blocks.append(header)
-        refs.append({"wid": f"W{idx}", "title": title, "url": url})
-        idx += 1
-    return ("\n\n---\n\n".join(blocks)), refs
+    hits = tuple(
+        (url, r.get("title") or url, r.get("text") or r.get("content") or r.get("snippet") or "")
+        for r in results
+        for url in (r.get("url") or r.get("href") or "",)
+        if url
+    )
+    text = _BLOCK_SEP.join(
+        f"[W{i}] {title}\n{url}" + (f"\n{body}" if body else "")
+        for i, (url, title, body) in enumerate(hits, start_index)
+    )
+    refs = tuple(
+        {"wid": f"W{i}", "title": title, "url": url}
+        for i, (url, title, _) in enumerate(hits, start_index)
+    )
+    return text, refs
 
 # ---------- Nodes ----------
+# 노드는 async로 구성: LLM 호출은 ainvoke, 블로킹 I/O(FAISS/임베딩/웹 검색)는 스레드로 위임해 이벤트 루프를 막지 않는다.
+def _locale(state: AgentState) -> str:
+    return "ko" if state.prefer_ko else "en"
+
+# semantic 캐시/검색 공용 질의 벡터: 동시 요청과 묶어 배치 임베딩 (실패 시 None → 캐시 우회)
+async def _embed_query_vec(text: str) -> Optional[List[float]]:
+    try:
+        return await get_batcher().embed(text)
+    except Exception:
+        return None
+
 # LangGraph나 LangChain 기반의 그래프(노드) 구조 안에서, "지식 검색 단계"를 담당하는 노드 함수
-def node_retrieve(state: AgentState) -> AgentState:
-    """RAG 검색 → ORA 직접 일치 필터."""
+async def node_retrieve(state: AgentState) -> AgentState:
+    """RAG 검색 → ORA 직접 일치 필터. (semantic 캐시 적중 시 검색 생략)"""
     k = 10
-    docs = retrieve(state.user_input, state.db_dir, k=k)
-
     ora = _extract_ora_code(state.user_input)
+
+    sem = get_semantic_cache()
+    bucket = None
+    if sem is not None:
+        if state.query_vec is None:
+            state.query_vec = await _embed_query_vec(state.user_input)
+        bucket = bucket_key(
+            "retrieve", ora,
+            db_dir=os.path.abspath(state.db_dir), manifest=manifest_fingerprint(state.db_dir), k=k,
+        )
+        hit = sem.lookup(bucket, state.query_vec)
+        if hit is not None:
+            state.retrieved_text, state.references = hit["retrieved_text"], hit["references"]
+            state.retrieved_text_trimmed = trim_to_tokens(state.retrieved_text)
+            return state
+
+    # 동시 요청과 묶어서 임베딩/FAISS 검색을 1회로 처리
+    docs = await get_batcher().submit(state.user_input, state.db_dir, k, embedding=state.query_vec)
+
     if ora:
         matched = [d for d in docs if ora in (d.page_content or "")]
     else:
         matched = docs
 
     if matched:
-        text, refs = _build_local_blocks(matched, start_index=1)
+        # matched는 FAISS 관련도 순서 그대로 유지(순위 = 위치+1). 토큰 예산은 관련도 순으로 블록 단위 적용
+        # → 잘리는 것은 항상 하위 순위 블록, references도 LLM이 실제로 보는 블록만 포함
+        # 정렬은 선택된 블록의 캐시 키/프롬프트용 사본에만 적용
+        # → 프롬프트 prefix가 요청 간 동일(AOAI prompt caching), 같은 문서 집합이면 문자열 재사용
+        ordered = sorted(_select_within_budget(matched), key=lambda rd: doc_sort_key(rd[1]))
+        docs_sorted = [d for _, d in ordered]
+        ctx_key = tuple(doc_key(d) for d in docs_sorted)
+        ctx_cache = get_context_cache()
+        hit = ctx_cache.get(ctx_key)
+        if hit is None:
+            text, refs = _build_local_blocks(docs_sorted, start_index=1, ranks=[r for r, _ in ordered])
+            ctx_cache.set(ctx_key, text, refs)
+        else:
+            text, refs = hit
+            # 같은 문서 집합이라도 질의마다 관련도 순위는 다를 수 있으므로 순위만 다시 기록
+            refs = tuple({**ref, "rank": rank} for ref, (rank, _) in zip(refs, ordered))
         state.retrieved_text, state.references = text, refs
     else:
-        state.retrieved_text, state.references = "", []
+        state.retrieved_text, state.references = "", None
+    state.retrieved_text_trimmed = trim_to_tokens(state.retrieved_text)
+
+    if sem is not None:
+        sem.add(bucket, state.query_vec, {"retrieved_text": state.retrieved_text, "references": state.references})
     return state
 
 # LangGraph 기반 파이프라인에서 오류 메시지를 “분석(analyze)”하는 노드 함수
-def node_analyze(state: AgentState) -> AgentState:
+async def node_analyze(state: AgentState) -> AgentState:
     """원인 JSON 작성(LLM). 로컬 문맥만 사용."""
-    state.causes_json = run_error_analyzer(
+    state.causes_json = await arun_error_analyzer(
         model=MODEL,
         user_input=state.user_input,
-        retrieved_context=state.retrieved_text or "",
+        retrieved_context=state.retrieved_text_trimmed,
         strict=True,
-        locale="ko" if getattr(state, "prefer_ko", True) else "en",  # ✅
+        locale=_locale(state),  # ✅
     ) or {}
     return state
 
 # 파이프라인에서 최종 해결책(솔루션)을 작성하는 노드
-def node_solution(state: AgentState) -> AgentState:
-    """해결 가이드(LLM). 우선 로컬 참조만으로 시도."""
-    md = run_solution_writer(
+async def node_solution(state: AgentState) -> AgentState:
+    """해결 가이드(LLM). 웹 결과가 이미 수집돼 있으면 함께 사용, 아니면 로컬 참조만."""
+    web_context = (state.web_context or "") if state.web_result_count else ""
+    md = await arun_solution_writer(
         model=MODEL,
         user_input=state.user_input,
         causes_json=state.causes_json or {},
-        retrieved_context=state.retrieved_text or "",
-        strict=True,
-        web_context="",   # 1차는 로컬만
-        locale="ko" if getattr(state, "prefer_ko", True) else "en",  # ✅
+        retrieved_context=state.retrieved_text_trimmed,
+        strict=not web_context,
+        web_context=web_context,
+        locale=_locale(state),  # ✅
     )
     state.solution_markdown = md or ""
     return state
 
-# 로컬 검색/지식으로 해결이 불충분할 때 웹 검색을 수행해 결과를 보완하는 노드
-def node_web_fallback(state: AgentState) -> AgentState:
-    """
-    로컬 문서가 없을 때만(=retrieved_text가 비었을 때) 웹 폴백 실행.
-    UI가 '웹 폴백 근거 없음'으로 오인하지 않게, 0건이어도 placeholder 1건을 넣어준다.
-    """
-    # 1) Allow 체크
-    if not state.allow_web:
-        state.web_attempted = False
-        state.web_result_count = 0
-        state.web_context = ""
-        state.web_refs = []
-        return state
-
-    # 2) 로컬 미확보(=문서에 없을 때)만 폴백
-    need_web = not bool((state.retrieved_text or "").strip())
-    if not need_web:
-        state.web_attempted = False
-        state.web_result_count = 0
-        state.web_context = ""
-        state.web_refs = []
-        return state
-
-    # 3) 웹 검색 실행
-    results, queries = search_web_safely(state.user_input, max_results=6)
+# 웹 검색만 수행해 [W#] 문맥/참조를 state에 채우는 함수 (LLM 호출 없음)
+async def _web_search(state: AgentState) -> AgentState:
+    results, queries = await asyncio.to_thread(search_web_safely, state.user_input, 6)
     state.web_attempted = True
     state.web_result_count = len(results)
 
@@ -180,19 +236,6 @@ def node_web_fallback(state: AgentState) -> AgentState:
         web_text, web_refs = _build_web_blocks(results, start_index=1)
         state.web_context = web_text
         state.web_refs = web_refs
-
-        # 웹 문맥으로 솔루션 1회 보강
-        md2 = run_solution_writer(
-            model=MODEL,
-            user_input=state.user_input,
-            causes_json=state.causes_json or {},
-            retrieved_context=state.retrieved_text or "",
-            strict=False,
-            web_context=state.web_context or "",
-            locale=("ko" if getattr(state, "prefer_ko", True) else "en"),  # ✅ 추가
-        )
-        if md2:
-            state.solution_markdown = md2
     else:
         # 🔴 여기서가 핵심: UI가 '웹 폴백 근거 없음'으로 오인하지 않게 placeholder를 넣는다.
         placeholder = {
@@ -203,49 +246,155 @@ def node_web_fallback(state: AgentState) -> AgentState:
         state.web_context = "웹 검색을 시도했지만 허용 도메인/길이 기준에 맞는 본문을 찾지 못했습니다."
         state.web_refs = [placeholder]
         state.web_result_count = 0  # 실제 수집 0건임을 유지
+    return state
 
+def _clear_web(state: AgentState) -> AgentState:
+    state.web_attempted = False
+    state.web_result_count = 0
+    state.web_context = ""
+    state.web_refs = None
     return state
 
-# 여러 노드(node)를 엮어 LangGraph 실행 그래프를 구성하고, 실행 가능한 앱(app)을 반환하는 함수
-def build_graph():
-    builder = StateGraph(AgentState)
-    builder.add_node("retrieve", node_retrieve)
-    builder.add_node("analyze",  node_analyze)
-    builder.add_node("solution", node_solution)
-    builder.add_node("web",      node_web_fallback)
+# 1차 솔루션이 빈약한지 판정하는 함수.
+# node_web_fallback은 로컬 문맥이 비었을 때만 돌기 때문에 "[R#] 포함 여부"는 기준이 될 수 없다
+# → 길이/문서 구조(섹션 헤딩 수)/인용 유효성(state.references에 없는 [R#] = 근거 없는 인용)/원인 분석으로 판정
+SOLUTION_WEAK_CHARS = int(os.getenv("SOLUTION_WEAK_CHARS", "400"))
+SOLUTION_MIN_SECTIONS = int(os.getenv("SOLUTION_MIN_SECTIONS", "2"))
+_R_TAG_RE = re.compile(r"\[R(\d+)\]")
+_MD_HEADING_RE = re.compile(r"^\s*#{1,6}\s+\S", re.MULTILINE)
+
+def _is_weak_solution(state: AgentState) -> bool:
+    md = state.solution_markdown or ""
+    valid = {ref.get("rid") for ref in (state.references or ())}
+    cites_missing = any(f"R{n}" not in valid for n in _R_TAG_RE.findall(md))
+    return (
+        len(md) < SOLUTION_WEAK_CHARS
+        or len(_MD_HEADING_RE.findall(md)) < SOLUTION_MIN_SECTIONS
+        or cites_missing
+        or not (state.causes_json or {}).get("causes")
+    )
+
+# 기존 솔루션 끝에 [W#] 웹 참고 링크 섹션을 덧붙이는 함수 (LLM 호출 없음)
+def _append_web_refs(state: AgentState) -> None:
+    refs = state.web_refs or ()
+    if not refs:
+        return
+    heading = "## 웹 참고(Web References)" if state.prefer_ko else "## Web References"
+    lines = "\n".join(f"- [{r['wid']}] [{r['title']}]({r['url']})" for r in refs)
+    state.solution_markdown = f"{(state.solution_markdown or '').rstrip()}\n\n{heading}\n{lines}\n"
+
+# 로컬 검색/지식으로 해결이 불충분할 때 웹 검색을 수행해 결과를 보완하는 노드
+async def node_web_fallback(state: AgentState) -> AgentState:
+    """
+    로컬 문서가 없을 때만(=retrieved_text가 비었을 때) 웹 폴백 실행.
+    UI가 '웹 폴백 근거 없음'으로 오인하지 않게, 0건이어도 placeholder 1건을 넣어준다.
+    """
+    # 1) Allow 체크
+    if not state.allow_web:
+        return _clear_web(state)
 
-    builder.set_entry_point("retrieve")
-    builder.add_edge("retrieve", "analyze")
-    builder.add_edge("analyze",  "solution")
-    builder.add_edge("solution", "web")
+    # 2) 로컬 미확보(=문서에 없을 때)만 폴백
+    need_web = not bool((state.retrieved_text or "").strip())
+    if not need_web:
+        return _clear_web(state)
 
-    memory = MemorySaver()
-    return builder.compile(checkpointer=memory)
+    # 3) 웹 검색 실행
+    await _web_search(state)
+
+    if not state.web_result_count:
+        return state
+    # 1차 솔루션이 충분하면(구조/길이 충족, 존재하지 않는 [R#] 인용 없음) 재생성(LLM 2번째 호출) 없이
+    # 웹 참고 링크만 덧붙임. (run_pipeline 경로 전용 — two_step/stream 경로는 analyze ∥ web 후 1회만 작성)
+    if not _is_weak_solution(state):
+        _append_web_refs(state)
+        return state
+
+    # 웹 문맥으로 솔루션 1회 보강
+    md2 = await arun_solution_writer(
+        model=MODEL,
+        user_input=state.user_input,
+        causes_json=state.causes_json or {},
+        retrieved_context=state.retrieved_text_trimmed,
+        strict=False,
+        web_context=state.web_context or "",
+        locale=_locale(state),  # ✅ 추가
+    )
+    if md2:
+        state.solution_markdown = md2
+    return state
+
+# 일시적 실패로 품질이 떨어진 결과인지 판정하는 함수 (캐시에 저장하지 않음 → 다음 요청에서 재시도)
+# - 가이드가 비었거나, 원인 분석이 비었거나 LLM/파싱 실패, 또는 웹 폴백이 필요했는데 수집 0건(DDG/네트워크 일시 장애)
+def is_degraded_result(out: dict) -> bool:
+    causes = out.get("causes") or {}
+    return (
+        not out.get("solution_markdown")
+        or not causes.get("causes")
+        or causes.get("notes") == PARSE_FAILED_NOTE
+        or (bool(out.get("need_web")) and not out.get("web_result_count"))
+    )
+
+def _to_result(state: AgentState, need_web: bool) -> dict:
+    return {
+        "causes": state.causes_json or {},
+        "solution_markdown": state.solution_markdown or "",
+        "retrieved_text": state.retrieved_text or "",
+        "references": state.references or [],
+        "web_sources": state.web_refs or [],
+        "web_refs": state.web_refs or [],
+        "web_fallback_attempted": bool(state.web_attempted),
+        "web_result_count": int(state.web_result_count or 0),
+        "need_web": need_web,  # ✅ UI에 신호 제공
+    }
 
 # 웹을 쓰지 않고(offline) 로컬 지식만으로 1차 진단을 끝내는 실행 단계
-def run_local_phase(
+async def run_local_phase_async(
     user_input: str,
     db_dir: str,
     *,
     thread_id: str | None = None,
     prefer_ko: bool = True,   # ✅ locale 플래그 인자 추가
+    query_vec: Optional[List[float]] = None,
 ) -> AgentState:
     """retrieve → analyze → solution까지만 수행 (웹 미포함)"""
-    state = AgentState(user_input=user_input, db_dir=db_dir, allow_web=True)
-    state.prefer_ko = prefer_ko  # ✅ 로컬 단계 시작 전에 주입
-    state = node_retrieve(state)
-    state = node_analyze(state)
-    state = node_solution(state)
+    state = AgentState(
+        user_input=user_input, db_dir=db_dir, allow_web=True,
+        prefer_ko=prefer_ko, query_vec=query_vec,  # ✅ 로컬 단계 시작 전에 주입
+    )
+    state = await node_retrieve(state)
+    state = await node_analyze(state)
+    state = await node_solution(state)
     return state
 
+def run_local_phase(
+    user_input: str,
+    db_dir: str,
+    *,
+    thread_id: str | None = None,
+    prefer_ko: bool = True,
+    query_vec: Optional[List[float]] = None,
+) -> AgentState:
+    """run_local_phase_async의 동기 래퍼 (Streamlit 등 이벤트 루프가 없는 호출자용)"""
+    return asyncio.run(run_local_phase_async(
+        user_input, db_dir, thread_id=thread_id, prefer_ko=prefer_ko, query_vec=query_vec,
+    ))
+
 # 로컬 단계에서 부족했던 근거를 웹 검색으로 채우고 최종 솔루션을 완성하는 함수
-def run_web_phase(
+async def run_web_phase_async(
     state: AgentState,
     *,
     thread_id: str | None = None,
 ) -> AgentState:
     """이미 로컬 단계를 마친 state에 대해, 필요 시 웹 폴백만 수행"""
-    return node_web_fallback(state)
+    return await node_web_fallback(state)
+
+def run_web_phase(
+    state: AgentState,
+    *,
+    thread_id: str | None = None,
+) -> AgentState:
+    """run_web_phase_async의 동기 래퍼"""
+    return asyncio.run(run_web_phase_async(state, thread_id=thread_id))
 
 # 전체 오류 분석 파이프라인을 통합 실행하는 메인 엔트리 포인트
 def run_pipeline(
@@ -260,75 +409,211 @@ def run_pipeline(
     if "allow_web_fallback" in kwargs and kwargs["allow_web_fallback"] is not None:
         allow_web = bool(kwargs["allow_web_fallback"])
 
-    app = build_graph()
-    initial = AgentState(user_input=user_input, db_dir=db_dir, allow_web=allow_web)
-    cfg = {"configurable": {"thread_id": thread_id or str(uuid4())}}
-    result = app.invoke(initial, config=cfg)
+    # exact-match 응답 캐시 조회 (반복 질의는 검색/LLM 호출 생략)
+    cache_key = make_key(
+        user_input=user_input, db_dir=db_dir, locale=locale,
+        allow_web=allow_web, model=MODEL, pipeline="graph",
+    )
+    if RESPONSE_CACHE_ENABLED:
+        cached = get_response_cache().get(cache_key)
+        if cached is not None:
+            return cached
 
-    get = lambda k, d=None: (result.get(k, d) if isinstance(result, dict) else getattr(result, k, d))
-    web_refs = get("web_refs", []) or []
-    return {
-        "causes": get("causes_json", {}),
-        "solution_markdown": get("solution_markdown", ""),
-        "retrieved_text": get("retrieved_text", ""),
-        "references": get("references", []),
+    # 선형 경로(retrieve → analyze → solution → web)는 그래프/체크포인터 없이 노드를 직접 호출
+    # (노드 경계마다 MemorySaver로 state를 직렬화하던 오버헤드 제거)
+    async def _run() -> AgentState:
+        state = await run_local_phase_async(
+            user_input, db_dir, thread_id=thread_id, prefer_ko=(locale == "ko"),
+        )
+        state.allow_web = allow_web
+        return await node_web_fallback(state)
+
+    final = asyncio.run(_run())
+    web_refs = final.web_refs or []
+    out = {
+        "causes": final.causes_json or {},
+        "solution_markdown": final.solution_markdown or "",
+        "retrieved_text": final.retrieved_text or "",
+        "references": final.references or [],
         "web_sources": web_refs,
         "web_refs": web_refs,
-        "web_fallback_attempted": bool(get("web_attempted", False)),
-        "web_result_count": int(get("web_result_count", 0) or 0),
+        "web_fallback_attempted": bool(final.web_attempted),
+        "web_result_count": int(final.web_result_count or 0),
     }
+    if RESPONSE_CACHE_ENABLED and out["solution_markdown"]:
+        get_response_cache().set(cache_key, out)
+    return out
+
+# 응답/semantic 캐시 조회 후 (적중 결과, 저장 함수, 질의 벡터)를 돌려주는 함수
+async def _lookup_caches(user_input: str, db_dir: str, allow_web: bool, locale: str):
+    cache_key = make_key(
+        user_input=user_input, db_dir=db_dir, locale=locale,
+        allow_web=allow_web, model=MODEL, pipeline="two_step",
+    )
+    sem = get_semantic_cache()
+    sem_bucket = bucket_key(
+        "pipeline", _extract_ora_code(user_input),
+        db_dir=os.path.abspath(db_dir), manifest=manifest_fingerprint(db_dir),
+        locale=locale, allow_web=allow_web, model=MODEL,
+    )
+    query_vec: Optional[List[float]] = None
+
+    async def store(out: dict) -> None:
+        # 빈 가이드/분석 실패/웹 0건 등 일시적 실패 결과는 캐시하지 않음
+        if is_degraded_result(out):
+            return
+        if RESPONSE_CACHE_ENABLED:
+            await get_response_cache().aset(cache_key, out)
+        if sem is not None:
+            sem.add(sem_bucket, query_vec, out)
+
+    if RESPONSE_CACHE_ENABLED:
+        cached = await get_response_cache().aget(cache_key)
+        if cached is not None:
+            return cached, store, None
+
+    # semantic 캐시: 표현만 다른 같은 ORA 질의면 이전 결과 재사용
+    query_vec = (await _embed_query_vec(user_input)) if sem is not None else None
+    if sem is not None:
+        hit = sem.lookup(sem_bucket, query_vec)
+        if hit is not None:
+            return hit, store, query_vec
+    return None, store, query_vec
+
+# retrieve → (analyze ∥ web) 까지 수행해 솔루션 작성 직전 state를 만드는 함수
+async def _prepare_state(
+    user_input: str,
+    db_dir: str,
+    *,
+    allow_web: bool,
+    prefer_ko: bool,
+    query_vec: Optional[List[float]],
+    on_web: Optional[Callable[[], None]] = None,
+) -> Tuple[AgentState, bool]:
+    # 1단계: 로컬 검색 (분석 노드가 돌기 전에 prefer_ko를 전달)
+    state = AgentState(
+        user_input=user_input, db_dir=db_dir, allow_web=allow_web,
+        prefer_ko=prefer_ko, query_vec=query_vec,  # ✅ 핵심
+    )
+    state = await node_retrieve(state)
+
+    # 2단계 조건 판정: retrieve 직후 확정되므로 웹 검색을 분석과 겹쳐 실행
+    need_web = allow_web and not bool((state.retrieved_text or "").strip())
+
+    if need_web:
+        if on_web is not None:
+            on_web()  # 진행 표시 훅 (예: Streamlit status 라벨을 실제 웹 단계 시작 시점에 갱신)
+        await asyncio.gather(node_analyze(state), _web_search(state))
+    else:
+        await node_analyze(state)
+        # 웹 미시도 명시
+        _clear_web(state)
+    return state, need_web
 
 # **1단계(로컬) → 2단계(웹 보강, 필요 시만)**로 동작하는 오케스트레이터
-def run_pipeline_two_step(
+async def run_pipeline_two_step_async(
     user_input: str,
     db_dir: str,
     *,
     allow_web: bool = True,
     prefer_ko: bool = True,      # ✅ 추가
     thread_id: str | None = None,
+    on_web: Optional[Callable[[], None]] = None,
 ) -> dict:
     """
-    1) 로컬 단계 수행 → 2) 로컬 스니펫이 없고 allow_web=True면 웹 폴백만 수행
-    UI에서 상태 라벨을 바꾸기 쉽게 단계가 분리된 호출.
+    1) 로컬 검색 → 2) 로컬 스니펫이 없고 allow_web=True면 웹 검색을 원인 분석(LLM)과 병렬로 수행
+    → 3) 수집된 문맥(로컬 또는 로컬+웹)으로 해결 가이드 1회 작성.
+    최악 지연이 analyze + web + solution 합에서 max(analyze, web) + solution으로 줄어든다.
+    동일 질의(정규화 기준)는 응답 캐시에서 즉시 반환.
+    on_web: 웹 검색을 실제로 시작하기 직전에 1회 호출되는 콜백 (UI 진행 표시용).
     """
+    locale = "ko" if prefer_ko else "en"
+    cached, store, query_vec = await _lookup_caches(user_input, db_dir, allow_web, locale)
+    if cached is not None:
+        return cached
 
-    # 1단계: 로컬 (분석 노드가 돌기 전에 prefer_ko를 전달)
-    state = run_local_phase(
-        user_input,
-        db_dir,
-        thread_id=thread_id,
-        prefer_ko=prefer_ko,  # ✅ 핵심
+    state, need_web = await _prepare_state(
+        user_input, db_dir, allow_web=allow_web, prefer_ko=prefer_ko, query_vec=query_vec,
+        on_web=on_web,
     )
+    state = await node_solution(state)
 
-    # 2단계 조건 판정
-    need_web = allow_web and not bool((state.retrieved_text or "").strip())
+    # 반환 포맷은 run_pipeline과 동일
+    out = _to_result(state, need_web)
+    await store(out)
+    return out
 
-    if need_web:
-        state.allow_web = True
-        state = run_web_phase(state, thread_id=thread_id)
-    else:
-        # 웹 미시도 명시
-        state.web_attempted = False
-        state.web_result_count = 0
-        state.web_refs = []
-        state.web_context = ""
+# 해결 가이드를 토큰 단위로 흘려보내는 스트리밍 오케스트레이터 (/troubleshoot/stream)
+async def run_pipeline_stream(
+    user_input: str,
+    db_dir: str,
+    *,
+    allow_web: bool = True,
+    prefer_ko: bool = True,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    이벤트 순서:
+      {"event": "context", "data": {causes, references, web_sources, ...}}  — 로컬/웹 단계 결과
+      {"event": "token",   "data": "..."}                                     — 솔루션 토큰 조각
+      {"event": "revised", "data": {...run_pipeline_two_step 결과...}}       — 후처리된 최종 본문
+    """
+    locale = "ko" if prefer_ko else "en"
+    cached, store, query_vec = await _lookup_caches(user_input, db_dir, allow_web, locale)
+    if cached is not None:
+        yield {"event": "context", "data": {k: v for k, v in cached.items() if k != "solution_markdown"}}
+        yield {"event": "token", "data": cached.get("solution_markdown", "")}
+        yield {"event": "revised", "data": cached}
+        return
 
-    # 반환 포맷은 run_pipeline과 동일
-    return {
-        "causes": state.causes_json or {},
-        "solution_markdown": state.solution_markdown or "",
-        "retrieved_text": state.retrieved_text or "",
-        "references": state.references or [],
-        "web_sources": state.web_refs or [],
-        "web_refs": state.web_refs or [],
-        "web_fallback_attempted": bool(state.web_attempted),
-        "web_result_count": int(state.web_result_count or 0),
-        "need_web": need_web,  # ✅ UI에 신호 제공
-    }
+    state, need_web = await _prepare_state(
+        user_input, db_dir, allow_web=allow_web, prefer_ko=prefer_ko, query_vec=query_vec,
+    )
+    ctx = _to_result(state, need_web)
+    ctx.pop("solution_markdown", None)
+    yield {"event": "context", "data": ctx}
+
+    web_context = (state.web_context or "") if state.web_result_count else ""
+    parts: List[str] = []
+    async for piece in arun_solution_stream(
+        model=MODEL,
+        user_input=state.user_input,
+        causes_json=state.causes_json or {},
+        retrieved_context=state.retrieved_text_trimmed,
+        strict=not web_context,
+        web_context=web_context,
+        locale=locale,
+    ):
+        parts.append(piece)
+        yield {"event": "token", "data": piece}
+
+    state.solution_markdown = _strip_unreferenced_lines("".join(parts))
+    out = _to_result(state, need_web)
+    await store(out)
+    yield {"event": "revised", "data": out}
+
+def run_pipeline_two_step(
+    user_input: str,
+    db_dir: str,
+    *,
+    allow_web: bool = True,
+    prefer_ko: bool = True,
+    thread_id: str | None = None,
+    on_web: Optional[Callable[[], None]] = None,
+) -> dict:
+    """run_pipeline_two_step_async의 동기 래퍼 (Streamlit용)"""
+    return asyncio.run(run_pipeline_two_step_async(
+        user_input, db_dir, allow_web=allow_web, prefer_ko=prefer_ko, thread_id=thread_id,
+        on_web=on_web,
+    ))
 
 __all__ = [
+    "is_degraded_result",
     "run_pipeline",
     "run_pipeline_two_step",
+    "run_pipeline_two_step_async",
+    "run_pipeline_stream",
     "run_local_phase",
+    "run_local_phase_async",
     "run_web_phase",
-]
\ No newline at end of file
+    "run_web_phase_async",
+]
@@ -0,0 +1,70 @@
+# app/cache/context_cache.py
+"""
+검색된 문서 집합 → [R#] 문맥 문자열 캐시.
+- 키: 정렬된 (file_hash, page, chunk_hash) 튜플 → 서로 다른 질의라도 같은 top-k면 재사용
+- 정렬 순서가 고정되므로 solution_writer 프롬프트 prefix가 요청 간 동일 → AOAI 자동 prompt caching 적중
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import os
+import threading
+
+CONTEXT_CACHE_CAPACITY = int(os.getenv("CONTEXT_CACHE_CAPACITY", "512"))
+
+DocKey = Tuple[str, str, str]
+
+# 문서 1건의 안정적인 식별 키 (file_hash, page, chunk_hash)
+def doc_key(d) -> DocKey:
+    meta = getattr(d, "metadata", {}) or {}
+    file_hash = str(meta.get("file_hash") or meta.get("source") or "")
+    page = str(meta.get("page", ""))
+    chunk_hash = hashlib.sha1((d.page_content or "").encode("utf-8")).hexdigest()[:16]
+    return file_hash, page, chunk_hash
+
+# 문서 정렬 키 (file_hash, page, chunk_index) — 검색 점수와 무관하게 항상 같은 순서
+def doc_sort_key(d) -> Tuple[str, int, int, str]:
+    meta = getattr(d, "metadata", {}) or {}
+    try:
+        page = int(meta.get("page") or 0)
+    except (TypeError, ValueError):
+        page = 0
+    try:
+        idx = int(meta.get("chunk_index") or 0)
+    except (TypeError, ValueError):
+        idx = 0
+    return str(meta.get("file_hash") or meta.get("source") or ""), page, idx, doc_key(d)[2]
+
+
+class LocalContextCache:
+    """doc-id 집합 → (retrieved_text, references) LRU (thread-safe)."""
+
+    def __init__(self, capacity: int = 512):
+        self.capacity = max(1, capacity)
+        self._data: "OrderedDict[Tuple[DocKey, ...], Tuple[str, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[DocKey, ...]) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            self._data.move_to_end(key)
+            text, refs = hit
+            return text, [dict(r) for r in refs]
+
+    def set(self, key: Tuple[DocKey, ...], text: str, refs: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._data[key] = (text, [dict(r) for r in refs])
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+
+
+_CACHE = LocalContextCache(CONTEXT_CACHE_CAPACITY)
+
+def get_context_cache() -> LocalContextCache:
+    return _CACHE
+
+__all__ = ["LocalContextCache", "get_context_cache", "doc_key", "doc_sort_key"]
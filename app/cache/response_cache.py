@@ -0,0 +1,189 @@
+# app/cache/response_cache.py
+"""
+End-to-end /troubleshoot 응답 캐시 (exact-match tier).
+- 1차: 프로세스 메모리 LRU(OrderedDict)
+- 2차: diskcache(SQLite 기반) — 설치되어 있지 않으면 메모리만 사용
+- 키: 정규화된 질의 + db_dir + locale + allow_web + model + manifest 지문
+  (ingest.py가 manifest.json을 갱신하면 지문이 바뀌어 자동 무효화)
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+try:
+    import diskcache  # SQLite 기반 디스크 캐시 (선택)
+except Exception:
+    diskcache = None
+
+# ---- 환경 플래그 ----
+RESPONSE_CACHE_ENABLED = (os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true")
+RESPONSE_CACHE_CAPACITY = int(os.getenv("RESPONSE_CACHE_CAPACITY", "256"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "86400"))  # 초 단위, 0이면 만료 없음
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", "./data/.response_cache")  # 빈 값이면 디스크 계층 끔
+
+_WS_RE = re.compile(r"\s+")
+_LINE_NO_RE = re.compile(r"\bline\s+\d+\b")  # 스택트레이스의 "line 123" → "line #"
+
+# 질의 문자열을 캐시 키용으로 정규화하는 함수 (소문자화 + 공백 축약 + 라인 번호 제거)
+def normalize_query(q: str) -> str:
+    s = (q or "").lower()
+    s = _LINE_NO_RE.sub("line #", s)
+    return _WS_RE.sub(" ", s).strip()
+
+# db_dir/manifest.json의 mtime+size로 인덱스 '신선도' 지문을 만드는 함수
+def manifest_fingerprint(db_dir: str) -> str:
+    try:
+        st = os.stat(os.path.join(db_dir, "manifest.json"))
+    except OSError:
+        return ""
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+# 캐시 키(SHA-256)를 생성하는 함수
+def make_key(*, user_input: str, db_dir: str, locale: str, allow_web: bool, model: str, **extra: Any) -> str:
+    payload = {
+        "q": normalize_query(user_input),
+        "db_dir": os.path.abspath(db_dir or ""),
+        "locale": locale,
+        "allow_web": bool(allow_web),
+        "model": model or "",
+        "manifest_hash": manifest_fingerprint(db_dir),
+        **extra,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class SmartResponseCache:
+    """메모리 LRU + 디스크 2계층 응답 캐시 (thread-safe)."""
+
+    def __init__(self, capacity: int = 256, ttl: int = 86400, disk_dir: str | None = None):
+        self.capacity = max(1, int(capacity))
+        self.ttl = int(ttl)
+        self._mem: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if disk_dir and diskcache is not None:
+            try:
+                self._disk = diskcache.Cache(disk_dir)
+            except Exception:
+                # 디스크 계층 초기화 실패 시 메모리만 사용
+                self._disk = None
+        self.hits_mem = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+    def _fresh(self, created: float) -> bool:
+        return self.ttl <= 0 or (time.time() - created) < self.ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                created, raw = hit
+                if self._fresh(created):
+                    self._mem.move_to_end(key)
+                    self.hits_mem += 1
+                    return json.loads(raw)
+                del self._mem[key]
+        # 디스크 I/O는 락 밖에서 (diskcache 자체가 thread/process-safe)
+        if self._disk is not None:
+            try:
+                raw, expire_at = self._disk.get(key, expire_time=True)
+            except Exception:
+                raw, expire_at = None, None
+            if raw is not None:
+                # 디스크 적중 → 메모리로 승격. 생성 시각은 디스크 만료 시각에서 역산해 유지
+                # (승격할 때마다 TTL이 연장되지 않도록)
+                created = (expire_at - self.ttl) if (expire_at and self.ttl > 0) else time.time()
+                with self._lock:
+                    self._put_mem(key, raw, created)
+                    self.hits_disk += 1
+                return json.loads(raw)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        raw = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._put_mem(key, raw, time.time())
+        if self._disk is not None:
+            try:
+                self._disk.set(key, raw, expire=(self.ttl if self.ttl > 0 else None))
+            except Exception:
+                pass
+
+    # async 경로(/troubleshoot 등)용: 블로킹 디스크 I/O를 이벤트 루프 밖 스레드에서 실행
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self.set, key, value)
+
+    def _put_mem(self, key: str, raw: str, created: float) -> None:
+        self._mem[key] = (created, raw)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.capacity:
+            self._mem.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            if self._disk is not None:
+                try:
+                    self._disk.clear()
+                except Exception:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            disk_size = None
+            if self._disk is not None:
+                try:
+                    disk_size = len(self._disk)
+                except Exception:
+                    disk_size = None
+            lookups = self.hits_mem + self.hits_disk + self.misses
+            return {
+                "enabled": RESPONSE_CACHE_ENABLED,
+                "capacity": self.capacity,
+                "ttl": self.ttl,
+                "mem_size": len(self._mem),
+                "disk_size": disk_size,
+                "hits_mem": self.hits_mem,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": ((self.hits_mem + self.hits_disk) / lookups) if lookups else 0.0,
+            }
+
+
+_CACHE: SmartResponseCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+# 프로세스 전역 응답 캐시 싱글톤을 반환하는 함수
+def get_response_cache() -> SmartResponseCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = SmartResponseCache(
+                    capacity=RESPONSE_CACHE_CAPACITY,
+                    ttl=RESPONSE_CACHE_TTL,
+                    disk_dir=RESPONSE_CACHE_DIR or None,
+                )
+    return _CACHE
+
+__all__ = [
+    "SmartResponseCache",
+    "get_response_cache",
+    "make_key",
+    "manifest_fingerprint",
+    "normalize_query",
+    "RESPONSE_CACHE_ENABLED",
+]
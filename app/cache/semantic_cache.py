@@ -0,0 +1,163 @@
+# app/cache/semantic_cache.py
+"""
+Semantic(임베딩 유사도) 캐시 — exact-match 캐시 다음 계층.
+- 질의 벡터는 호출측이 전달 (supervisor가 rag.batcher로 원문 질의를 1회 임베딩해 FAISS 검색에도 재사용)
+  → L2 정규화 후 버킷별 IndexFlatIP에서 최근접 1건 검색
+- 코사인 유사도 >= SEMANTIC_CACHE_THRESHOLD 이면 저장된 payload 재사용
+- 버킷 = (namespace, ORA 코드, 문맥 지문) → 서로 다른 ORA 코드 간 오탐 방지
+- 버킷이 커지면(>= SEMANTIC_CACHE_LSH_MIN) 랜덤 프로젝션 LSH(IndexLSH)로 후보를 좁힌 뒤 정확 코사인으로 재확인
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+try:
+    import faiss
+except Exception:
+    faiss = None
+
+# ---- 환경 플래그 ----
+SEMANTIC_CACHE_ENABLED = (os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.93"))
+SEMANTIC_CACHE_MAX_PER_BUCKET = int(os.getenv("SEMANTIC_CACHE_MAX_PER_BUCKET", "20000"))
+SEMANTIC_CACHE_LSH_MIN = int(os.getenv("SEMANTIC_CACHE_LSH_MIN", "10000"))
+SEMANTIC_CACHE_LSH_BITS = int(os.getenv("SEMANTIC_CACHE_LSH_BITS", "256"))
+_LSH_CANDIDATES = 16
+
+# 버킷 키(해시 prefix)를 만드는 함수: ORA 코드가 같아야만 같은 버킷으로 묶인다
+def bucket_key(namespace: str, ora_code: Optional[str], **context: Any) -> str:
+    ctx = hashlib.sha256(json.dumps(context, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()[:16]
+    return f"{namespace}:{ora_code or '-'}:{ctx}"
+
+# 임베딩 벡터를 float32 + L2 정규화(내적 = 코사인)로 바꾸는 함수
+def _normalize(vec) -> np.ndarray:
+    v = np.asarray(vec, dtype="float32").reshape(1, -1)
+    n = float(np.linalg.norm(v))
+    return v / n if n > 0 else v
+
+
+class _Bucket:
+    """ORA 코드/문맥별 작은 벡터 인덱스 + payload 목록."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.index = faiss.IndexFlatIP(dim)
+        self.vecs: List[np.ndarray] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.lsh = None
+
+    def search(self, v: np.ndarray) -> tuple[float, Optional[Dict[str, Any]]]:
+        if not self.payloads:
+            return -1.0, None
+        if self.lsh is not None:
+            # LSH 후보 → 정확 코사인 재확인
+            _, ids = self.lsh.search(v, _LSH_CANDIDATES)
+            cand = [i for i in ids[0] if i >= 0]
+            if not cand:
+                return -1.0, None
+            sims = np.vstack([self.vecs[i] for i in cand]) @ v[0]
+            j = int(np.argmax(sims))
+            return float(sims[j]), self.payloads[cand[j]]
+        scores, ids = self.index.search(v, 1)
+        i = int(ids[0][0])
+        if i < 0:
+            return -1.0, None
+        return float(scores[0][0]), self.payloads[i]
+
+    def add(self, v: np.ndarray, payload: Dict[str, Any]) -> None:
+        if len(self.payloads) >= SEMANTIC_CACHE_MAX_PER_BUCKET:
+            # 가장 오래된 항목 제거(FIFO). IndexFlat.remove_ids는 id를 앞으로 당겨 재번호한다.
+            self.index.remove_ids(np.array([0], dtype="int64"))
+            self.vecs.pop(0)
+            self.payloads.pop(0)
+            if self.lsh is not None:
+                self.lsh.remove_ids(np.array([0], dtype="int64"))
+        self.index.add(v)
+        self.vecs.append(v[0])
+        self.payloads.append(payload)
+        if self.lsh is not None:
+            self.lsh.add(v)
+        elif len(self.payloads) >= SEMANTIC_CACHE_LSH_MIN:
+            self._rebuild_lsh()
+
+    def _rebuild_lsh(self) -> None:
+        lsh = faiss.IndexLSH(self.dim, SEMANTIC_CACHE_LSH_BITS)
+        lsh.add(np.vstack(self.vecs))
+        self.lsh = lsh
+
+
+class SemanticCache:
+    """임베딩 유사도 기반 2차 캐시 (thread-safe)."""
+
+    def __init__(self, threshold: float = 0.93):
+        self.threshold = threshold
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, bucket: str, vec: Optional[Sequence[float]]) -> Optional[Dict[str, Any]]:
+        if vec is None:
+            return None
+        vec = _normalize(vec)
+        with self._lock:
+            b = self._buckets.get(bucket)
+            if b is None or b.dim != vec.shape[1]:
+                self.misses += 1
+                return None
+            score, payload = b.search(vec)
+            if payload is not None and score >= self.threshold:
+                self.hits += 1
+                return json.loads(json.dumps(payload))  # 호출측 변경으로부터 원본 보호
+            self.misses += 1
+            return None
+
+    def add(self, bucket: str, vec: Optional[Sequence[float]], payload: Dict[str, Any]) -> None:
+        if vec is None:
+            return
+        vec = _normalize(vec)
+        with self._lock:
+            b = self._buckets.get(bucket)
+            if b is None or b.dim != vec.shape[1]:
+                b = self._buckets[bucket] = _Bucket(vec.shape[1])
+            b.add(vec, json.loads(json.dumps(payload)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": bool(SEMANTIC_CACHE_ENABLED and faiss is not None),
+                "threshold": self.threshold,
+                "buckets": len(self._buckets),
+                "entries": sum(len(b.payloads) for b in self._buckets.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+_CACHE: SemanticCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+# 프로세스 전역 semantic 캐시 싱글톤. 비활성/faiss 미설치면 None
+def get_semantic_cache() -> Optional[SemanticCache]:
+    global _CACHE
+    if not SEMANTIC_CACHE_ENABLED or faiss is None:
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = SemanticCache(threshold=SEMANTIC_CACHE_THRESHOLD)
+    return _CACHE
+
+__all__ = [
+    "SemanticCache",
+    "get_semantic_cache",
+    "bucket_key",
+    "SEMANTIC_CACHE_ENABLED",
+]
@@ -0,0 +1,91 @@
+# app/common/clients.py
+"""
+Azure OpenAI 호출용 공유 HTTP 커넥션 풀.
+- 호출마다 클라이언트를 만들면 httpx 풀도 새로 생겨 TCP/TLS 세션을 재사용하지 못함 → 프로세스 전역 1개 공유
+- 동기 httpx.Client는 thread-safe → 프로세스 싱글톤
+- httpx.AsyncClient의 커넥션은 생성된 이벤트 루프에 묶임 → 루프별로 1개
+  (Streamlit 동기 래퍼는 asyncio.run마다 새 루프를 쓰므로 루프가 사라지면 함께 정리)
+"""
+from __future__ import annotations
+from typing import Any, Dict
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+from openai import AzureOpenAI, AsyncAzureOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+
+from ..settings import AOAI_ENDPOINT, AOAI_API_KEY, AZURE_OPENAI_API_VERSION
+
+AOAI_MAX_CONNECTIONS = int(os.getenv("AOAI_MAX_CONNECTIONS", "100"))
+AOAI_MAX_KEEPALIVE = int(os.getenv("AOAI_MAX_KEEPALIVE", "50"))
+AOAI_KEEPALIVE_EXPIRY = float(os.getenv("AOAI_KEEPALIVE_EXPIRY", "30"))
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=AOAI_MAX_CONNECTIONS,
+        max_keepalive_connections=AOAI_MAX_KEEPALIVE,
+        keepalive_expiry=AOAI_KEEPALIVE_EXPIRY,
+    )
+
+_LOCK = threading.Lock()
+_HTTP: httpx.Client | None = None
+_AOAI: AzureOpenAI | None = None
+_LOOP_LOCAL: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Any, Any]]" = weakref.WeakKeyDictionary()
+
+# 프로세스 전역 동기 httpx 클라이언트 (AzureChatOpenAI/AzureOpenAIEmbeddings의 http_client)
+def get_http_client() -> httpx.Client:
+    global _HTTP
+    if _HTTP is None:
+        with _LOCK:
+            if _HTTP is None:
+                _HTTP = DefaultHttpxClient(limits=_limits())
+    return _HTTP
+
+# 현재 이벤트 루프 전용 캐시 dict (루프별 async 클라이언트/LLM 객체 보관용)
+def loop_cache() -> Dict[Any, Any]:
+    loop = asyncio.get_running_loop()
+    cache = _LOOP_LOCAL.get(loop)
+    if cache is None:
+        cache = _LOOP_LOCAL[loop] = {}
+    return cache
+
+# 현재 이벤트 루프의 httpx.AsyncClient (AzureChatOpenAI의 http_async_client)
+def get_async_http_client() -> httpx.AsyncClient:
+    cache = loop_cache()
+    client = cache.get("http")
+    if client is None:
+        client = cache["http"] = DefaultAsyncHttpxClient(limits=_limits())
+    return client
+
+# openai SDK 동기 클라이언트 (공유 커넥션 풀 사용)
+def get_aoai_client() -> AzureOpenAI:
+    global _AOAI
+    if _AOAI is None:
+        with _LOCK:
+            if _AOAI is None:
+                _AOAI = AzureOpenAI(
+                    azure_endpoint=AOAI_ENDPOINT, api_key=AOAI_API_KEY,
+                    api_version=AZURE_OPENAI_API_VERSION, http_client=get_http_client(),
+                )
+    return _AOAI
+
+# openai SDK 비동기 클라이언트 (현재 루프의 커넥션 풀 사용)
+def get_async_aoai_client() -> AsyncAzureOpenAI:
+    cache = loop_cache()
+    client = cache.get("aoai")
+    if client is None:
+        client = cache["aoai"] = AsyncAzureOpenAI(
+            azure_endpoint=AOAI_ENDPOINT, api_key=AOAI_API_KEY,
+            api_version=AZURE_OPENAI_API_VERSION, http_client=get_async_http_client(),
+        )
+    return client
+
+__all__ = [
+    "get_http_client",
+    "get_async_http_client",
+    "get_aoai_client",
+    "get_async_aoai_client",
+    "loop_cache",
+]
@@ -0,0 +1,18 @@
+# app/common/patterns.py
+"""
+모듈 공용 정규식(모듈 로드 시 1회 컴파일).
+- ORA_RE: 대소문자 무시 (ora-12541도 매칭) → 입력 전체를 .upper()로 복사하지 않고 검색
+- ORA_RE_UPPER: 이미 대문자로 정규화된 텍스트용
+- 양쪽 단어 경계(\\b): ORA-125410, XORA-12541 같은 입력에서 ORA-12541을 잘못 뽑지 않도록 (웹/로컬 공통)
+"""
+import re
+
+ORA_RE = re.compile(r"\bORA-\d{5}\b", re.IGNORECASE)
+ORA_RE_UPPER = re.compile(r"\bORA-\d{5}\b")
+
+# 문자열에서 첫 번째 ORA 코드를 대문자로 반환하는 함수 (없으면 None)
+def find_ora_code(text: str):
+    m = ORA_RE.search(text or "")
+    return m.group(0).upper() if m else None
+
+__all__ = ["ORA_RE", "ORA_RE_UPPER", "find_ora_code"]
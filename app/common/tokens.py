@@ -0,0 +1,52 @@
+# app/common/tokens.py
+"""
+토큰 수 기준 문맥 자르기 (문자 수 slicing 대체).
+- 영어는 문자 슬라이스가 토큰을 과다 포함하고, 한글/CJK는 과소 포함 → tiktoken으로 정확히 자른다.
+- 같은 문맥 문자열은 요청 간 반복되므로(context cache) 결과를 LRU로 메모이즈
+- count_tokens: 검색 청크를 관련도 순으로 블록 단위 선택할 때 예산 계산에 사용
+- tiktoken 미설치/인코딩 로드 실패 시 대략 1 token ≈ 4 chars로 폴백
+"""
+from functools import lru_cache
+import os
+
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "3000"))
+_CHARS_PER_TOKEN = 4
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception:
+        return None
+
+# 문자열의 토큰 수 (청크 단위 예산 계산용, 같은 청크는 요청 간 반복되므로 메모이즈)
+@lru_cache(maxsize=4096)
+def count_tokens(s: str) -> int:
+    if not s:
+        return 0
+    enc = _encoding()
+    if enc is None:
+        return -(-len(s) // _CHARS_PER_TOKEN)
+    return len(enc.encode(s, disallowed_special=()))
+
+# 문자열을 최대 n 토큰으로 자르는 함수 (이미 짧으면 원본 그대로 반환)
+@lru_cache(maxsize=256)
+def trim_to_tokens(s: str, n: int = CONTEXT_MAX_TOKENS) -> str:
+    if not s:
+        return ""
+    enc = _encoding()
+    if enc is None:
+        return s[: n * _CHARS_PER_TOKEN]
+    ids = enc.encode(s, disallowed_special=())
+    if len(ids) <= n:
+        return s
+    return enc.decode(ids[:n])
+
+__all__ = ["count_tokens", "trim_to_tokens", "CONTEXT_MAX_TOKENS"]
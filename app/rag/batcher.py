@@ -0,0 +1,152 @@
+"""Retrieval micro-batcher.
+- 동시에 들어온 질의를 MAX_WAIT_MS(기본 5ms) 동안 최대 MAX_BATCH(기본 16)개까지 모아
+  embed_documents([...]) 1회 + FAISS index.search(matrix, k) 1회로 처리한다.
+  (양자화 인덱스면 retriever.search_ids가 후보를 FP32로 재정렬)
+- 호출측 API는 그대로: `docs = await get_batcher().submit(query, db_dir, k)`
+- semantic 캐시용 질의 벡터도 `vec = await get_batcher().embed(query)`로 같은 배치 임베딩(embed_documents)을 탄다
+  (질의 벡터 LRU 적중분은 API 호출 없이 재사용). 기본 설정에서는 embed → submit 순으로 배치를 두 번 거친다.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import os
+import weakref
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .retriever import (
+    build_embeddings,
+    cached_query_vec,
+    ids_to_docs,
+    load_vectorstore,
+    remember_query_vec,
+    search_ids,
+)
+
+MAX_BATCH = int(os.getenv("RETRIEVE_MAX_BATCH", "16"))
+MAX_WAIT_MS = float(os.getenv("RETRIEVE_MAX_WAIT_MS", "5"))
+
+
+class _Item:
+    # k=None → 임베딩만 요청 (결과는 벡터 list)
+    __slots__ = ("query", "db_dir", "k", "embedding", "future")
+
+    def __init__(self, query: str, db_dir: str, k: Optional[int], embedding: Optional[Sequence[float]], future: asyncio.Future):
+        self.query = query
+        self.db_dir = db_dir
+        self.k = k
+        self.embedding = embedding
+        self.future = future
+
+
+# 한 배치를 동기적으로 처리하는 함수 (스레드에서 실행): 임베딩 1회 + db_dir별 검색 1회
+def _process_batch(items: List[_Item]) -> List[Tuple[Optional[object], Optional[BaseException]]]:
+    out: List[Tuple[Optional[object], Optional[BaseException]]] = [(None, None)] * len(items)
+    vecs: List[Optional[Sequence[float]]] = [
+        it.embedding if it.embedding is not None else cached_query_vec(it.query) for it in items
+    ]
+
+    # 1) 벡터가 없는 질의만 모아서(중복 제거) 임베딩 API 1회 호출
+    miss = [i for i, v in enumerate(vecs) if v is None]
+    if miss:
+        texts = list(dict.fromkeys(items[i].query for i in miss))
+        try:
+            embs = build_embeddings().embed_documents(texts)
+            by_text = {t: remember_query_vec(t, e) for t, e in zip(texts, embs)}
+            for i in miss:
+                vecs[i] = by_text[items[i].query]
+        except Exception as e:
+            for i in miss:
+                out[i] = (None, e)
+
+    # 2) 임베딩만 요청한 항목은 벡터 반환, 나머지는 db_dir별로 묶어서 index.search 1회
+    groups: Dict[str, List[int]] = {}
+    for i, it in enumerate(items):
+        if vecs[i] is None:
+            continue
+        if it.k is None:
+            out[i] = (np.asarray(vecs[i], dtype="float32").tolist(), None)
+        else:
+            groups.setdefault(it.db_dir, []).append(i)
+
+    for db_dir, idxs in groups.items():
+        try:
+            vs = load_vectorstore(db_dir)
+            mat = np.vstack([np.asarray(vecs[i], dtype="float32") for i in idxs])
+            if getattr(vs, "_normalize_L2", False):
+                import faiss
+                faiss.normalize_L2(mat)
+            kmax = max(items[i].k for i in idxs)
+            ids = search_ids(db_dir, mat, kmax)  # 양자화 인덱스면 FP32 재정렬 포함
+            for row, i in enumerate(idxs):
+                out[i] = (ids_to_docs(vs, ids[row][: items[i].k]), None)
+        except Exception as e:
+            for i in idxs:
+                out[i] = (None, e)
+    return out
+
+
+class RetrievalBatcher:
+    """이벤트 루프별 asyncio.Queue 기반 수집기."""
+
+    def __init__(self, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, query: str, db_dir: str, k: int = 5, *, embedding: Optional[Sequence[float]] = None) -> List[Document]:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        fut = loop.create_future()
+        await self._queue.put(_Item(query, db_dir, k, embedding, fut))
+        return await fut
+
+    async def embed(self, query: str) -> List[float]:
+        """질의 벡터만 배치로 계산 (semantic 캐시 조회용, 같은 벡터를 submit(embedding=...)에 재사용)."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        fut = loop.create_future()
+        await self._queue.put(_Item(query, "", None, None, fut))
+        return await fut
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                results = await asyncio.to_thread(_process_batch, batch)
+            except Exception as e:
+                results = [(None, e)] * len(batch)
+            for it, (docs, err) in zip(batch, results):
+                if it.future.done():
+                    continue
+                if err is not None:
+                    it.future.set_exception(err)
+                elif it.k is None:
+                    it.future.set_result(docs)
+                else:
+                    it.future.set_result(docs or [])
+
+
+_BATCHERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, RetrievalBatcher]" = weakref.WeakKeyDictionary()
+
+# 현재 이벤트 루프에 묶인 batcher를 반환하는 함수 (asyncio.run마다 루프가 다르므로 루프별로 생성)
+def get_batcher() -> RetrievalBatcher:
+    loop = asyncio.get_running_loop()
+    b = _BATCHERS.get(loop)
+    if b is None:
+        b = _BATCHERS[loop] = RetrievalBatcher()
+    return b
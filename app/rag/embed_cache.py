@@ -0,0 +1,78 @@
+"""Content-addressed embedding cache for ingest.
+- 키: sha256(임베딩 배포명 + 청크 텍스트) → 같은 텍스트는 다른 PDF/재인덱싱에서도 재임베딩하지 않음
+- 저장소: diskcache(SQLite, <db_dir>/emb_cache), 값은 float32 bytes (FAISS도 float32로 저장)
+- embed_documents는 미스만 모아 내부 임베딩 API를 호출하고, 결과를 원래 순서로 돌려준다.
+- diskcache 미설치 시 캐시 없이 그대로 위임
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional
+import hashlib
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import diskcache  # SQLite 기반 디스크 캐시 (선택)
+except Exception:
+    diskcache = None
+
+EMBED_CACHE_ENABLED = (os.getenv("EMBED_CACHE_ENABLED", "true").lower() == "true")
+EMBED_CACHE_DIRNAME = "emb_cache"
+
+
+class CachedEmbeddings(Embeddings):
+    """임베딩 함수를 감싸 embed_documents 결과를 디스크에 영구 캐시하는 래퍼."""
+
+    def __init__(self, inner: Embeddings, cache_dir: str, namespace: str = ""):
+        self.inner = inner
+        self.namespace = namespace or str(getattr(inner, "model", "") or "")
+        self._cache = diskcache.Cache(cache_dir) if diskcache is not None else None
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self._cache is None:
+            return self.inner.embed_documents(texts)
+        keys = [self._key(t) for t in texts]
+        out: List[Optional[List[float]]] = [None] * len(texts)
+        miss: List[int] = []
+        for i, k in enumerate(keys):
+            raw = self._cache.get(k)
+            if raw is None:
+                miss.append(i)
+            else:
+                out[i] = np.frombuffer(raw, dtype="float32").tolist()
+        self.hits += len(texts) - len(miss)
+        self.misses += len(miss)
+        if miss:
+            # 미스만 한 번에 API 호출 (같은 배치 안의 중복 텍스트는 한 번만)
+            pending: Dict[str, str] = {}
+            for i in miss:
+                pending.setdefault(keys[i], texts[i])
+            fresh = dict(zip(pending, self.inner.embed_documents(list(pending.values()))))
+            with self._cache.transact():
+                for k, e in fresh.items():
+                    self._cache.set(k, np.asarray(e, dtype="float32").tobytes())
+            for i in miss:
+                out[i] = list(fresh[keys[i]])
+        return out  # type: ignore[return-value]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.inner.embed_query(text)
+
+    def close(self) -> None:
+        if self._cache is not None:
+            self._cache.close()
+
+
+# db_dir 전용 캐시로 감싼 임베딩을 반환하는 함수 (비활성/diskcache 미설치면 원본 그대로)
+def with_embed_cache(embeddings: Embeddings, db_dir: str) -> Embeddings:
+    if not EMBED_CACHE_ENABLED or diskcache is None or isinstance(embeddings, CachedEmbeddings):
+        return embeddings
+    return CachedEmbeddings(embeddings, os.path.join(db_dir, EMBED_CACHE_DIRNAME))
+
+__all__ = ["CachedEmbeddings", "with_embed_cache", "EMBED_CACHE_ENABLED"]
@@ -1,13 +1,19 @@
+from __future__ import annotations
 import argparse
 import os
 import time
-import json
 import hashlib
+import mmap
 from math import ceil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+import orjson
 
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
 
@@ -16,53 +22,225 @@ try:
 except ImportError:
     from langchain.text_splitter import RecursiveCharacterTextSplitter
 
-from .retriever import build_embeddings
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:  # 선택 의존성: 없으면 중복 제거 단계만 건너뜀
+    MinHash = MinHashLSH = None
+
+from .retriever import build_embeddings, FP32_VECTORS_FILE
+from .embed_cache import CachedEmbeddings, with_embed_cache
+
+CHUNK_SIZE = 1200
+CHUNK_OVERLAP = 200
+
+_MMAP_BLOCK = 8 << 20  # 8 MiB
+
+# ---- 근사 중복 청크 제거 (MinHash/LSH) ----
+# 머리말/꼬리말/"See Also" 등 복붙된 보일러플레이트 청크를 임베딩 전에 걸러낸다.
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+DEDUP_SHINGLE = 5  # 단어 5-gram
+
+# 파일 지문(절대경로, 크기, mtime_ns) — manifest의 stat_cache 키/검증값
+def _stat_sig(path: str) -> Tuple[str, int, int]:
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+# stat_cache에서 변경 없는 파일의 해시를 꺼내는 함수 (없거나 변경됐으면 None)
+def cached_sha256(path: str, stat_cache: Dict) -> Optional[str]:
+    key, size, mtime_ns = _stat_sig(path)
+    hit = stat_cache.get(key)
+    if hit and hit[0] == size and hit[1] == mtime_ns:
+        return hit[2]
+    return None
+
+def remember_sha256(path: str, digest: str, stat_cache: Dict) -> None:
+    key, size, mtime_ns = _stat_sig(path)
+    stat_cache[key] = [size, mtime_ns, digest]
 
 # 파일의 SHA-256 해시값(고유 지문)을 계산하는 함수
-def sha256_file(path: str) -> str:
-    h = hashlib.sha256()
+# stat_cache가 주어지면 (경로, 크기, mtime)이 같은 파일은 다시 읽지 않는다.
+def sha256_file(path: str, stat_cache: Optional[Dict] = None) -> str:
+    if stat_cache is not None:
+        hit = cached_sha256(path, stat_cache)
+        if hit:
+            return hit
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+        if hasattr(hashlib, "file_digest"):
+            # Py 3.11+: C 루프에서 읽기+해시
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        else:
+            h = hashlib.sha256()
+            size = os.fstat(f.fileno()).st_size
+            if size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for i in range(0, size, _MMAP_BLOCK):
+                        h.update(mm[i:i + _MMAP_BLOCK])
+            digest = h.hexdigest()
+    if stat_cache is not None:
+        remember_sha256(path, digest, stat_cache)
+    return digest
 
 # 지식 파일(예: Oracle 오류 PDF, 벡터 DB, 문서 세트 등)의 목록과 메타데이터를 로드하는 함수
 def load_manifest(db_dir: str) -> Dict:
     path = os.path.join(db_dir, "manifest.json")
     if not os.path.exists(path):
         return {"files": []}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
 
 # 지식 파일을 저장하는 함수
 def save_manifest(db_dir: str, manifest: Dict):
     os.makedirs(db_dir, exist_ok=True)
     path = os.path.join(db_dir, "manifest.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    # orjson은 UTF-8 bytes를 바로 만들므로 바이너리 모드로 기록 (stdlib json 대비 수 배 빠름)
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
 # PDF 문서를 AI 학습이나 검색(RAG)에 사용할 수 있도록 “청크(chunk)” 단위로 분할하는 함수
 def build_chunks_for_pdf(pdf_path: str, splitter: RecursiveCharacterTextSplitter) -> List[Document]:
     loader = PyPDFLoader(pdf_path)
     pages = loader.load()
     chunks = splitter.split_documents(pages)
-    for d in chunks:
+    for i, d in enumerate(chunks):
         d.metadata = d.metadata or {}
         d.metadata.setdefault("source", os.path.basename(pdf_path))
+        d.metadata["chunk_index"] = i  # 검색 결과 정렬 고정용 (context cache / prompt caching)
     return chunks
 
+# 청크 텍스트의 MinHash 서명(hashvalues)을 계산하는 함수 (워커에서 실행, numpy 배열이라 pickle 비용 작음)
+def minhash_signature(text: str, num_perm: int = DEDUP_NUM_PERM) -> np.ndarray:
+    words = (text or "").lower().split()
+    n = DEDUP_SHINGLE
+    shingles = {" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+    mh = MinHash(num_perm=num_perm)
+    mh.update_batch([sh.encode("utf-8") for sh in shingles])
+    return mh.hashvalues
+
+# 서명이 이미 등록된 근사 중복(자카드 >= threshold)이면 제거하고, 남은 청크에 dedup_group을 기록하는 함수
+# 입력 순서대로 처리하므로 가장 먼저 나온 청크가 남는다.
+def dedup_chunks(chunks: List[Document], sigs: List[np.ndarray], threshold: float = DEDUP_THRESHOLD) -> List[Document]:
+    lsh = MinHashLSH(threshold=threshold, num_perm=DEDUP_NUM_PERM)
+    kept: List[Document] = []
+    for d, sig in zip(chunks, sigs):
+        mh = MinHash(num_perm=DEDUP_NUM_PERM, hashvalues=sig)
+        if lsh.query(mh):
+            continue
+        group = f"{str(d.metadata.get('file_hash', ''))[:12]}:{d.metadata.get('chunk_index', len(kept))}"
+        lsh.insert(group, mh)
+        d.metadata["dedup_group"] = group
+        kept.append(d)
+    return kept
+
+# 프로세스 풀 워커: splitter는 버전에 따라 pickle이 안 되므로 워커 안에서 생성
+# dedup=True면 MinHash 서명도 워커에서 함께 계산 (CPU 바운드 → 병렬화)
+def _chunk_pdf_worker(
+    pdf_path: str, chunk_size: int, chunk_overlap: int, dedup: bool = False,
+) -> Tuple[List[Document], Optional[List[np.ndarray]]]:
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = build_chunks_for_pdf(pdf_path, splitter)
+    sigs = [minhash_signature(d.page_content) for d in chunks] if dedup else None
+    return chunks, sigs
+
 # FAISS(벡터 검색 인덱스)를 새로 만들거나, 기존 인덱스를 불러오는 함수
+# (ingest는 인덱스를 수정하므로 retriever의 공유 캐시가 아닌 새 인스턴스를 로드)
 def build_or_load_faiss(db_dir: str, embeddings) -> FAISS:
     return FAISS.load_local(db_dir, embeddings, allow_dangerous_deserialization=True)
 
+# ---- 인덱스 구성 ----
+# 청크가 적을 때는 Flat(정확 검색)이 더 빠르고, 많아지면 HNSW 그래프 인덱스로 O(N) 스캔을 피한다.
+HNSW_MIN_VECTORS = int(os.getenv("FAISS_HNSW_MIN", "500"))
+HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("FAISS_HNSW_EF_CONSTRUCTION", "200"))
+# 양자화(HNSW 규모에서만 적용): sq8 = 8bit 스칼라 양자화(4x 축소), pq = Product Quantization(PQ_M 바이트/벡터)
+QUANTIZE_CHOICES = ("none", "sq8", "pq")
+PQ_M = int(os.getenv("FAISS_PQ_M", "64"))
+PQ_NBITS = 8
+TRAIN_MAX_VECTORS = int(os.getenv("FAISS_TRAIN_MAX", "65536"))
+
+# 벡터 개수에 맞는 FAISS 인덱스(Flat / HNSW / 양자화 HNSW)를 새로 만드는 함수
+def _new_index(dim: int, n: int, quantize: str = "none"):
+    import faiss
+    if n < HNSW_MIN_VECTORS:
+        # 소규모 코퍼스는 양자화 없이 FP32 Flat 유지 (정확 검색이 가장 빠름)
+        return faiss.IndexFlatL2(dim)
+    if quantize == "pq" and (dim % PQ_M != 0 or n < (1 << PQ_NBITS)):
+        print(f"[WARN] PQ needs dim % {PQ_M} == 0 and >= {1 << PQ_NBITS} vectors; falling back to sq8.")
+        quantize = "sq8"
+    if quantize == "sq8":
+        index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, HNSW_M)
+    elif quantize == "pq":
+        index = faiss.IndexHNSWPQ(dim, PQ_M, HNSW_M)
+    else:
+        index = faiss.IndexHNSWFlat(dim, HNSW_M)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    return index
+
+# 양자화 인덱스 여부 (FP32 사이드카로 재정렬이 필요한지)
+def _is_quantized(index) -> bool:
+    import faiss
+    return isinstance(index, (faiss.IndexHNSWSQ, faiss.IndexHNSWPQ, faiss.IndexScalarQuantizer, faiss.IndexPQ))
+
+# 학습이 필요한 인덱스(SQ/PQ)를 최대 TRAIN_MAX_VECTORS개 샘플로 학습시키는 함수
+def _train_if_needed(index, mat: np.ndarray) -> None:
+    if index.is_trained:
+        return
+    sample = mat
+    if len(mat) > TRAIN_MAX_VECTORS:
+        rng = np.random.default_rng(0)
+        sample = mat[np.sort(rng.choice(len(mat), TRAIN_MAX_VECTORS, replace=False))]
+    print(f"[INFO] Training {type(index).__name__} on {len(sample)} vectors ...")
+    index.train(np.ascontiguousarray(sample, dtype="float32"))
+
+# 기존 Flat 인덱스가 임계치를 넘으면 같은 순서로 HNSW로 옮겨 담는 함수 (docstore id 매핑 유지)
+# 반환값: 옮겨 담은 기존 FP32 벡터 (양자화 사이드카용, 업그레이드가 없으면 None)
+def _maybe_upgrade_index(vs: FAISS, dim: int, new_mat: np.ndarray, quantize: str = "none") -> Optional[np.ndarray]:
+    import faiss
+    n_old = vs.index.ntotal
+    n_new = len(new_mat)
+    if not isinstance(vs.index, faiss.IndexFlat) or (n_old + n_new) < HNSW_MIN_VECTORS:
+        return None
+    print(f"[INFO] Upgrading existing Flat index ({n_old} vectors) to HNSW (M={HNSW_M}, quantize={quantize}).")
+    index = _new_index(dim, n_old + n_new, quantize)
+    old = vs.index.reconstruct_n(0, n_old) if n_old else np.zeros((0, dim), dtype="float32")
+    _train_if_needed(index, np.vstack([old, new_mat]))
+    if n_old:
+        index.add(old)
+    vs.index = index
+    return old
+
+# 양자화 인덱스용 FP32 원본 벡터(인덱스 id 순서)를 db_dir에 저장하는 함수 — 검색 시 상위 후보 정확 재정렬에 사용
+def _save_fp32_sidecar(db_dir: str, index, old: Optional[np.ndarray], new_mat: np.ndarray) -> None:
+    path = os.path.join(db_dir, FP32_VECTORS_FILE)
+    if not _is_quantized(index):
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    if old is None:
+        n_old = index.ntotal - len(new_mat)
+        if n_old and not os.path.exists(path):
+            print("[WARN] FP32 sidecar missing for existing vectors; re-ranking disabled (use --rebuild).")
+            return
+        old = np.load(path) if n_old else np.zeros((0, new_mat.shape[1]), dtype="float32")
+    np.save(path, np.vstack([old, new_mat]).astype("float32", copy=False))
+
 # 여러 문서를 벡터 인덱싱(임베딩)할 때 진행 상태(progress)를 표시하며 처리하는 함수
-def index_with_progress(all_chunks: List[Document], db_dir: str, embeddings, start_with_existing: bool, batch_size: int = 64):
+def index_with_progress(
+    all_chunks: List[Document],
+    db_dir: str,
+    embeddings,
+    start_with_existing: bool,
+    batch_size: int = 64,
+    quantize: str = "none",
+):
     total = len(all_chunks)
     if total == 0:
         print("[INFO] No new chunks to index. Nothing to do.")
         return
 
     os.makedirs(db_dir, exist_ok=True)
+    # 청크 텍스트 해시 기반 임베딩 캐시: 이미 임베딩한 텍스트는 API를 다시 호출하지 않음
+    embeddings = with_embed_cache(embeddings, db_dir)
     num_batches = (total + batch_size - 1) // batch_size
     print(f"[INFO] Building embeddings and updating FAISS index...")
     print(f"[INFO] Total NEW chunks: {total} | Batch size: {batch_size} | Batches: {num_batches}")
@@ -73,16 +251,20 @@ def index_with_progress(all_chunks: List[Document], db_dir: str, embeddings, sta
     if start_with_existing and os.path.exists(os.path.join(db_dir, "index.faiss")):
         vs = build_or_load_faiss(db_dir, embeddings)
 
+    # 1) 배치 단위 임베딩 (진행률 표시)
+    texts: List[str] = []
+    metadatas: List[Dict] = []
+    vectors: List[List[float]] = []
     processed = 0
     for b in range(num_batches):
         s = b * batch_size
         e = min((b + 1) * batch_size, total)
         batch_docs = all_chunks[s:e]
 
-        if vs is None:
-            vs = FAISS.from_documents(batch_docs, embeddings)
-        else:
-            vs.add_documents(batch_docs)
+        batch_texts = [d.page_content for d in batch_docs]
+        vectors.extend(embeddings.embed_documents(batch_texts))
+        texts.extend(batch_texts)
+        metadatas.extend(d.metadata for d in batch_docs)
 
         processed = e
         elapsed = time.time() - start
@@ -91,20 +273,49 @@ def index_with_progress(all_chunks: List[Document], db_dir: str, embeddings, sta
         percent = (processed / total) * 100.0
         print(f"[PROGRESS] {processed}/{total} ({percent:5.1f}%) | elapsed={timedelta(seconds=int(elapsed))} | eta={timedelta(seconds=int(remaining))}")
 
-    vs.save_local(db_dir)
+    # 2) 인덱스 구성: 전체 벡터 수 기준으로 Flat/HNSW(+양자화) 선택 후 한 번에 add
+    dim = len(vectors[0])
+    new_mat = np.asarray(vectors, dtype="float32")
+    old = None
+    if vs is None:
+        vs = FAISS(
+            embedding_function=embeddings,
+            index=_new_index(dim, total, quantize),
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+        )
+        old = np.zeros((0, dim), dtype="float32")
+    else:
+        old = _maybe_upgrade_index(vs, dim, new_mat, quantize)
+    _train_if_needed(vs.index, new_mat)
+    print(f"[INFO] Adding vectors to {type(vs.index).__name__} ...")
+    vs.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
+    _save_fp32_sidecar(db_dir, vs.index, old, new_mat)
+
+    vs.save_local(db_dir)  # 내부적으로 faiss.write_index 사용 → 인덱스 타입 그대로 보존
     total_elapsed = time.time() - start
-    print(f"[INFO] Saved/updated FAISS index in {db_dir}. Added chunks: {total}")
+    print(f"[INFO] Saved/updated FAISS index in {db_dir}. Added chunks: {total} | Index: {type(vs.index).__name__} (ntotal={vs.index.ntotal})")
     print(f"[INFO] Total time: {timedelta(seconds=int(total_elapsed))}")
-
-
-def main(pdf_dir: str, db_dir: str, batch_size: int, rebuild: bool, merge: bool):
+    if isinstance(embeddings, CachedEmbeddings):
+        print(f"[INFO] Embedding cache: {embeddings.hits} hit(s), {embeddings.misses} miss(es)")
+        embeddings.close()
+
+
+def main(
+    pdf_dir: str,
+    db_dir: str,
+    batch_size: int,
+    rebuild: bool,
+    merge: bool,
+    workers: int | None = None,
+    quantize: str = "none",
+    dedup: bool = True,
+):
     os.makedirs(db_dir, exist_ok=True)
 
     manifest = load_manifest(db_dir)
     known = {f["hash"]: f for f in manifest.get("files", [])}
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=1200, chunk_overlap=200)
-
     pdf_files = [os.path.join(pdf_dir, f) for f in os.listdir(pdf_dir) if f.lower().endswith(".pdf")]
     if not pdf_files:
         print(f"[WARN] No PDF files found in: {pdf_dir}")
@@ -112,8 +323,10 @@ def main(pdf_dir: str, db_dir: str, batch_size: int, rebuild: bool, merge: bool)
 
     if rebuild:
         print("[INFO] Rebuild mode: existing index will be overwritten.")
-        manifest = {"files": []}
+        # 파일 해시 캐시는 인덱스와 무관하므로 유지
+        manifest = {"files": [], "stat_cache": manifest.get("stat_cache", {})}
         known = {}
+    stat_cache = manifest.setdefault("stat_cache", {})
 
     if os.path.exists(os.path.join(db_dir, "index.faiss")):
         if rebuild:
@@ -128,27 +341,70 @@ def main(pdf_dir: str, db_dir: str, batch_size: int, rebuild: bool, merge: bool)
 
     new_chunks: List[Document] = []
     to_add_files = []
-
-    for i, path in enumerate(sorted(pdf_files)):
-        file_hash = sha256_file(path)
-        base = os.path.basename(path)
-
-        if not rebuild and merge and file_hash in known:
-            print(f"[SKIP] {base}: already indexed (hash matched).")
-            continue
-
-        print(f"[INFO] [{i+1}/{len(pdf_files)}] Loading & chunking: {base}")
-        chunks = build_chunks_for_pdf(path, splitter)
+    pdf_files = sorted(pdf_files)
+    workers = max(1, workers or os.cpu_count() or 1)
+    if dedup and MinHash is None:
+        print("[WARN] datasketch not installed; skipping near-duplicate chunk removal.")
+        dedup = False
+
+    # PDF 로딩/청크 분할과 해시 계산은 CPU 바운드 → 프로세스 풀로 병렬화
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 변경 없는 파일(크기/mtime 동일)은 manifest의 stat_cache로 해시 생략
+        hashes = {path: cached_sha256(path, stat_cache) for path in pdf_files}
+        misses = [path for path, h in hashes.items() if not h]
+        if misses:
+            print(f"[INFO] Hashing {len(misses)} changed/new PDF(s) ({len(pdf_files) - len(misses)} cached)")
+        for path, digest in zip(misses, pool.map(sha256_file, misses)):
+            hashes[path] = digest
+            remember_sha256(path, digest, stat_cache)
+
+        todo = []
+        for path in pdf_files:
+            if not rebuild and merge and hashes[path] in known:
+                print(f"[SKIP] {os.path.basename(path)}: already indexed (hash matched).")
+                continue
+            todo.append(path)
+
+        print(f"[INFO] Loading & chunking {len(todo)} PDF(s) with {workers} worker(s)...")
+        futures = {pool.submit(_chunk_pdf_worker, path, CHUNK_SIZE, CHUNK_OVERLAP, dedup): path for path in todo}
+        chunks_by_path: Dict[str, List[Document]] = {}
+        sigs_by_path: Dict[str, Optional[List[np.ndarray]]] = {}
+        for n, fut in enumerate(as_completed(futures), 1):
+            path = futures[fut]
+            chunks_by_path[path], sigs_by_path[path] = fut.result()
+            print(f"[INFO] [{n}/{len(todo)}] Loaded & chunked: {os.path.basename(path)} ({len(chunks_by_path[path])} chunks)")
+
+    # 완료 순서와 무관하게 파일명 순서로 합쳐 결과를 결정적으로 유지
+    all_sigs: List[np.ndarray] = []
+    for path in todo:
+        file_hash = hashes[path]
+        chunks = chunks_by_path[path]
         for d in chunks:
             d.metadata["file_hash"] = file_hash
         new_chunks.extend(chunks)
-        to_add_files.append({"name": base, "hash": file_hash, "chunks": len(chunks)})
+        if dedup:
+            all_sigs.extend(sigs_by_path[path])
+
+    print(f"[INFO] Split complete. NEW chunks: {len(new_chunks)}")
+    if dedup and new_chunks:
+        before = len(new_chunks)
+        new_chunks = dedup_chunks(new_chunks, all_sigs)
+        print(f"[INFO] Dedup (MinHash, jaccard>={DEDUP_THRESHOLD}): dropped {before - len(new_chunks)} near-duplicate chunk(s)")
+
+    per_file: Dict[str, int] = {}
+    for d in new_chunks:
+        per_file[d.metadata["file_hash"]] = per_file.get(d.metadata["file_hash"], 0) + 1
+    for path in todo:
+        to_add_files.append({"name": os.path.basename(path), "hash": hashes[path], "chunks": per_file.get(hashes[path], 0)})
 
-    print(f"[INFO] Split complete. NEW chunks to add: {len(new_chunks)}")
+    print(f"[INFO] NEW chunks to add: {len(new_chunks)}")
 
     embeddings = build_embeddings()
     start_with_existing = (not rebuild) and os.path.exists(os.path.join(db_dir, "index.faiss"))
-    index_with_progress(new_chunks, db_dir, embeddings, start_with_existing=start_with_existing, batch_size=batch_size)
+    index_with_progress(
+        new_chunks, db_dir, embeddings,
+        start_with_existing=start_with_existing, batch_size=batch_size, quantize=quantize,
+    )
 
     for f in to_add_files:
         manifest["files"] = [x for x in manifest.get("files", []) if x["hash"] != f["hash"]]
@@ -170,9 +426,13 @@ if __name__ == "__main__":
     parser.add_argument("--batch_size", type=int, default=64, help="Embedding batch size (default: 64)")
     parser.add_argument("--rebuild", action="store_true", help="Rebuild the whole index from scratch (ignore existing index/manifest).")
     parser.add_argument("--merge", action="store_true", help="Merge: add only new PDFs that have not been indexed yet.")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel workers for hashing/chunking (default: CPU count)")
+    parser.add_argument("--quantize", choices=QUANTIZE_CHOICES, default="none",
+                        help="Quantize HNSW-sized indexes: sq8 (int8) or pq (product quantization). Small corpora stay FP32 Flat.")
+    parser.add_argument("--no_dedup", action="store_true", help="Disable MinHash near-duplicate chunk removal before embedding.")
     args = parser.parse_args()
 
     merge = args.merge or True
     rebuild = args.rebuild or False
 
-    main(args.pdf_dir, args.db_dir, batch_size=args.batch_size, rebuild=rebuild, merge=merge)
+    main(args.pdf_dir, args.db_dir, batch_size=args.batch_size, rebuild=rebuild, merge=merge, workers=args.workers, quantize=args.quantize, dedup=not args.no_dedup)
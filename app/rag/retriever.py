@@ -1,10 +1,16 @@
 """FAISS retriever utilities.
-- build_embeddings(): returns an Azure OpenAI embedding function
+- build_embeddings(): returns an Azure OpenAI embedding function (process-wide singleton)
 - retrieve(query, db_dir, k): loads FAISS and returns top-k Documents
+  (embedding을 넘기면 질의 임베딩 API 호출을 생략)
+- warm_retriever(db_dir, queries): 인덱스 선로딩 + 자주 쓰는 질의 선임베딩(cold-start 방지)
+- 양자화 인덱스(ingest --quantize)는 상위 k*FAISS_RERANK_FACTOR 후보를 FP32 사이드카로 정확 재정렬(2단계 검색)
 """
-from typing import List
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 import os
+import threading
 
+import numpy as np
 from langchain_community.vectorstores import FAISS
 from langchain_openai import AzureOpenAIEmbeddings
 from langchain_core.documents import Document
@@ -15,27 +21,166 @@ from ..settings import (
     AOAI_DEPLOY_EMBED_3_LARGE,
     AZURE_OPENAI_API_VERSION,
 )
+from ..common.clients import get_http_client
 
-# 텍스트 데이터를 벡터(embedding)로 변환해주는 함수
+# 자주 발생하는 ORA 코드 (서버 기동 시 선임베딩 대상)
+COMMON_ORA_QUERIES = [
+    "ORA-00001", "ORA-00054", "ORA-00060", "ORA-00904", "ORA-00911",
+    "ORA-00918", "ORA-00933", "ORA-00936", "ORA-00942", "ORA-01017",
+    "ORA-01031", "ORA-01034", "ORA-01403", "ORA-01422", "ORA-01555",
+    "ORA-01653", "ORA-04031", "ORA-12154", "ORA-12514", "ORA-12541",
+]
+
+HNSW_EF_SEARCH = int(os.getenv("FAISS_HNSW_EF_SEARCH", "64"))
+RERANK_FACTOR = max(1, int(os.getenv("FAISS_RERANK_FACTOR", "2")))
+# 양자화 인덱스와 같은 id 순서의 FP32 원본 벡터 (ingest.py가 기록)
+FP32_VECTORS_FILE = "vectors.f32.npy"
+
+_EMB: Optional[AzureOpenAIEmbeddings] = None
+_EMB_LOCK = threading.Lock()
+
+# 텍스트 데이터를 벡터(embedding)로 변환해주는 함수 (클라이언트/httpx 세션은 1회만 생성)
 def build_embeddings() -> AzureOpenAIEmbeddings:
+    global _EMB
+    if _EMB is not None:
+        return _EMB
     # settings.py에서 1차 검증했지만 혹시 모를 상황을 위해 재확인
     if not AOAI_ENDPOINT or not AOAI_API_KEY or not AOAI_DEPLOY_EMBED_3_LARGE:
         raise RuntimeError(
             "[retriever] Azure OpenAI credentials or deployment name missing. "
             "Check .env and app/settings.py."
         )
-    return AzureOpenAIEmbeddings(
-        azure_endpoint=AOAI_ENDPOINT,
-        api_key=AOAI_API_KEY,
-        model=AOAI_DEPLOY_EMBED_3_LARGE,   # '배포 이름'(Deployment name)
-        api_version=AZURE_OPENAI_API_VERSION,
-    )
+    with _EMB_LOCK:
+        if _EMB is None:
+            _EMB = AzureOpenAIEmbeddings(
+                azure_endpoint=AOAI_ENDPOINT,
+                api_key=AOAI_API_KEY,
+                model=AOAI_DEPLOY_EMBED_3_LARGE,   # '배포 이름'(Deployment name)
+                api_version=AZURE_OPENAI_API_VERSION,
+                http_client=get_http_client(),  # keep-alive 튜닝된 공유 커넥션 풀
+            )
+    return _EMB
 
-# 지식 검색 단계(retrieval step) 를 수행하는 함수
-def retrieve(query: str, db_dir: str, k: int = 5) -> List[Document]:
-    if not os.path.exists(os.path.join(db_dir, "index.faiss")):
+# 질의 임베딩 LRU (동일 문자열은 API 재호출 없음). batcher도 조회/저장하므로 lru_cache 대신 직접 관리
+# float32 배열로 보관: 3072차원 기준 항목당 ~12KB (파이썬 float 튜플은 ~100KB)
+QUERY_VEC_CACHE_MAX = 1024
+_QVEC: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_QVEC_LOCK = threading.Lock()
+
+def cached_query_vec(text: str) -> Optional[np.ndarray]:
+    with _QVEC_LOCK:
+        v = _QVEC.get(text)
+        if v is not None:
+            _QVEC.move_to_end(text)
+        return v
+
+def remember_query_vec(text: str, vec: Sequence[float]) -> np.ndarray:
+    v = np.asarray(vec, dtype="float32")
+    v.setflags(write=False)  # 캐시 공유 배열 보호
+    with _QVEC_LOCK:
+        _QVEC[text] = v
+        _QVEC.move_to_end(text)
+        while len(_QVEC) > QUERY_VEC_CACHE_MAX:
+            _QVEC.popitem(last=False)
+    return v
+
+def embed_query(text: str) -> List[float]:
+    v = cached_query_vec(text)
+    if v is None:
+        v = remember_query_vec(text, build_embeddings().embed_query(text))
+    return v.tolist()
+
+# db_dir → (mtime, 객체): db_dir당 최신 1개만 유지 (재인덱싱 시 이전 인덱스를 즉시 해제)
+_VS_CACHE: Dict[str, Tuple[float, FAISS]] = {}
+_FP32_CACHE: Dict[str, Tuple[float, np.ndarray]] = {}
+_LOAD_LOCK = threading.Lock()
+
+def _load_vs(db_dir: str) -> FAISS:
+    vs = FAISS.load_local(db_dir, build_embeddings(), allow_dangerous_deserialization=True)
+    hnsw = getattr(vs.index, "hnsw", None)
+    if hnsw is not None:
+        # HNSW 탐색 폭 (ingest.py가 청크 수에 따라 HNSW로 구성한 경우)
+        hnsw.efSearch = HNSW_EF_SEARCH
+    return vs
+
+# (mtime이 같으면) 캐시된 객체, 아니면 새로 로드해 교체하는 함수
+def _cached_by_mtime(cache: Dict, key: str, mtime: float, load):
+    hit = cache.get(key)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    with _LOAD_LOCK:
+        hit = cache.get(key)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+        obj = load()
+        cache[key] = (mtime, obj)  # 같은 db_dir의 이전(mtime) 항목은 덮어써서 해제
+        return obj
+
+# db_dir의 현재 인덱스(캐시)를 반환하는 함수. index.faiss mtime이 바뀌면
+# (ingest.py의 save_local 이후) 자동으로 새로 로드된다.
+def load_vectorstore(db_dir: str) -> FAISS:
+    path = os.path.join(db_dir, "index.faiss")
+    if not os.path.exists(path):
         raise FileNotFoundError(f"FAISS index not found in {db_dir}. Run ingest first.")
-    embeddings = build_embeddings()
-    vs = FAISS.load_local(db_dir, embeddings, allow_dangerous_deserialization=True)
-    docs = vs.similarity_search(query, k=k)
+    key = os.path.abspath(db_dir)
+    return _cached_by_mtime(_VS_CACHE, key, os.path.getmtime(path), lambda: _load_vs(key))
+
+# FP32 사이드카를 memmap으로 여는 함수 (상주 메모리는 재정렬 후보 행만큼만 사용)
+def load_fp32_vectors(db_dir: str) -> Optional[np.ndarray]:
+    path = os.path.join(db_dir, FP32_VECTORS_FILE)
+    if not os.path.exists(path):
+        return None
+    key = os.path.abspath(path)
+    return _cached_by_mtime(_FP32_CACHE, key, os.path.getmtime(path), lambda: np.load(key, mmap_mode="r"))
+
+# 질의 행렬(float32, n x dim)로 top-k id를 구하는 함수. 양자화 인덱스면 후보를 넓게 뽑아 FP32 L2로 재정렬
+def search_ids(db_dir: str, mat: np.ndarray, k: int) -> np.ndarray:
+    vs = load_vectorstore(db_dir)
+    fp32 = load_fp32_vectors(db_dir)
+    if fp32 is None or len(fp32) != vs.index.ntotal:
+        _, ids = vs.index.search(mat, k)
+        return ids
+    _, cand = vs.index.search(mat, min(vs.index.ntotal, k * RERANK_FACTOR))
+    out = np.full((len(mat), k), -1, dtype="int64")
+    for row in range(len(mat)):
+        c = cand[row][cand[row] >= 0]
+        if not len(c):
+            continue
+        dist = ((fp32[c] - mat[row]) ** 2).sum(axis=1)
+        best = c[np.argsort(dist)[:k]]
+        out[row, : len(best)] = best
+    return out
+
+# FAISS id 목록 → Document 목록 (음수 id = 빈 슬롯)
+def ids_to_docs(vs: FAISS, ids: Sequence[int]) -> List[Document]:
+    docs: List[Document] = []
+    for j in ids:
+        if j < 0:
+            continue
+        doc = vs.docstore.search(vs.index_to_docstore_id[int(j)])
+        if isinstance(doc, Document):
+            docs.append(doc)
     return docs
+
+# 지식 검색 단계(retrieval step) 를 수행하는 함수
+def retrieve(query: str, db_dir: str, k: int = 5, *, embedding: Optional[Sequence[float]] = None) -> List[Document]:
+    vs = load_vectorstore(db_dir)
+    # semantic 캐시에서 이미 계산한 질의 벡터가 있으면 재사용
+    if embedding is None:
+        embedding = embed_query(query)
+    if load_fp32_vectors(db_dir) is None:
+        return vs.similarity_search_by_vector(list(embedding), k=k)
+    mat = np.asarray([embedding], dtype="float32")
+    return ids_to_docs(vs, search_ids(db_dir, mat, k)[0])
+
+# 서버 기동 시 인덱스 선로딩 + 자주 쓰는 질의 선임베딩
+def warm_retriever(db_dir: str, common_queries: Iterable[str] = COMMON_ORA_QUERIES) -> int:
+    load_vectorstore(db_dir)
+    n = 0
+    for q in common_queries:
+        try:
+            embed_query(q)  # semantic 캐시/검색과 같은 원문 키로 선임베딩
+            n += 1
+        except Exception:
+            break
+    return n
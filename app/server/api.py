@@ -1,11 +1,38 @@
 
 from typing import Optional
+import os
+import orjson
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from app.agents.supervisor import run_pipeline
+from app.agents.supervisor import run_pipeline_two_step_async, run_pipeline_stream
+from app.cache.response_cache import get_response_cache
+from app.cache.semantic_cache import get_semantic_cache
+from app.rag.retriever import warm_retriever, COMMON_ORA_QUERIES
 
-app = FastAPI(title="Debate Arena API", description="AI Oracle Error Troubleshooter API", version="0.1.0")
+# orjson 기반 응답 + charset 명시 (stdlib json 직렬화 대비 hot path 비용 절감)
+class UTF8ORJSONResponse(ORJSONResponse):
+    media_type = "application/json; charset=utf-8"
+
+app = FastAPI(
+    title="Debate Arena API",
+    description="AI Oracle Error Troubleshooter API",
+    version="0.1.0",
+    default_response_class=UTF8ORJSONResponse,
+)
+
+# 선로딩 대상 인덱스 경로 (요청의 db_dir과 같으면 첫 요청부터 warm 상태)
+FAISS_DB_DIR = os.getenv("FAISS_DB_DIR", "./data/faiss_index")
+
+# 서버 기동 시 FAISS 인덱스 선로딩 + 자주 쓰는 ORA 코드 선임베딩 (cold-start 지연 제거)
+@app.on_event("startup")
+def warm_up():
+    try:
+        n = warm_retriever(FAISS_DB_DIR, COMMON_ORA_QUERIES)
+        print(f"[api] retriever warmed: {FAISS_DB_DIR} ({n} queries pre-embedded)")
+    except Exception as e:
+        # 인덱스가 없거나 자격 증명 문제여도 서버는 기동
+        print("[api] retriever warm-up skipped:", repr(e))
 
 class Req(BaseModel):
     query: str
@@ -15,14 +42,39 @@ class Req(BaseModel):
     locale: Optional[str] = "en"  # 🔹 추가: 응답 언어 기본값 영어
 
 # 사용자 입력(오류 메시지/상황)을 받아 원인 분석 → 자료 검색 → 해결책 제시까지 한 번에 처리하는 “문제 해결 오케스트레이터” 역할의 함수
+# async 엔드포인트: 느린 LLM 호출이 이벤트 루프(다른 요청)를 막지 않는다.
 @app.post("/troubleshoot")
-def troubleshoot(req: Req):
-    out = run_pipeline(
+async def troubleshoot(req: Req):
+    out = await run_pipeline_two_step_async(
         user_input=req.query,
         db_dir=req.db_dir,
-        thread_id=None,
-        strict=req.strict,
-        allow_web=req.allow_web
+        allow_web=req.allow_web,
+        prefer_ko=((req.locale or "en").lower() == "ko"),
     )
-    # charset 명시
-    return JSONResponse(content=out, media_type="application/json; charset=utf-8")
\ No newline at end of file
+    # 응답 객체를 직접 반환해 jsonable_encoder 단계를 건너뛴다 (charset은 클래스에 명시)
+    return UTF8ORJSONResponse(content=out)
+
+# 같은 파이프라인을 SSE(text/event-stream)로 제공: context → token... → revised 순서로 이벤트 전송
+# 원인/참조를 먼저 보여주고 솔루션은 생성되는 대로 흘려보내 첫 토큰까지의 대기 시간을 줄인다.
+@app.post("/troubleshoot/stream")
+async def troubleshoot_stream(req: Req):
+    async def gen():
+        async for ev in run_pipeline_stream(
+            user_input=req.query,
+            db_dir=req.db_dir,
+            allow_web=req.allow_web,
+            prefer_ko=((req.locale or "en").lower() == "ko"),
+        ):
+            yield f"event: {ev['event']}\ndata: {orjson.dumps(ev['data']).decode()}\n\n"
+
+    return StreamingResponse(gen(), media_type="text/event-stream; charset=utf-8")
+
+# 응답 캐시 적중률/크기 확인용 엔드포인트
+@app.get("/cache/stats")
+def cache_stats():
+    sem = get_semantic_cache()
+    out = {
+        "response": get_response_cache().stats(),
+        "semantic": sem.stats() if sem is not None else {"enabled": False},
+    }
+    return UTF8ORJSONResponse(content=out)
@@ -1,20 +1,75 @@
 # app/streamlit_app.py
-import time
-import os, sys
+import os, re, sys
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # .../<project-root>
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 import uuid
 import streamlit as st
 from app.agents.supervisor import run_pipeline_two_step
-from app.agents.supervisor import run_pipeline
+from app.agents.supervisor import run_pipeline, is_degraded_result
+from app.cache.response_cache import manifest_fingerprint
+from app.rag.retriever import warm_retriever
 from app.settings import AOAI_ENDPOINT, AOAI_DEPLOY_EMBED_3_LARGE
 
 
+# 로컬 근거 폴백 표시용: retrieved_text의 [R#] 헤더 줄
+_REF_HEADER_RE = re.compile(r"^\[R(\d+)\]\s*(.+)$", re.MULTILINE)
+
+# 큰 원인 JSON은 접힌 상태로 렌더링 (클라이언트가 모든 키를 펼쳐 그리지 않게)
+_JSON_EXPAND_MAX_CHARS = 2000
+
+def _split_sections(md: str) -> list:
+    """솔루션 Markdown을 최상위 '## ' 헤딩 단위로 분할 (코드 펜스 안의 '## '는 무시).
+    섹션별로 st.markdown을 호출해 긴 본문을 한 번에 다시 파싱/렌더링하지 않게 한다."""
+    sections, cur, in_fence = [], [], False
+    for line in md.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and line.startswith("## ") and cur:
+            sections.append("\n".join(cur))
+            cur = []
+        cur.append(line)
+    if cur:
+        sections.append("\n".join(cur))
+    return sections
+
 st.set_page_config(page_title="AI Oracle Error Troubleshooter", page_icon="🛠️", layout="wide")
 st.title("🛠️ AI Oracle Error Troubleshooter")
 
 
+# ----------------------------
+# 캐시: Streamlit은 상호작용마다 스크립트 전체를 재실행하므로 비싼 호출을 메모이즈
+# ----------------------------
+# FAISS 인덱스 + 자주 쓰는 ORA 질의 임베딩을 재실행 간 유지 (manifest 지문이 바뀌면 다시 로드)
+@st.cache_resource(show_spinner=False)
+def _warm_index(db_dir: str, manifest: str) -> int:
+    try:
+        return warm_retriever(db_dir)
+    except Exception:
+        return 0
+
+# 같은 (질의, 인덱스, 옵션) 재요청은 검색/LLM 호출 없이 즉시 반환 (manifest 지문 포함 → 재인덱싱 시 무효화)
+# _on_web: '_' 접두사 인자는 st.cache_data 키 해시에서 제외됨 (진행 표시 콜백)
+# 실패/빈 결과는 예외로 빠져나가게 해 캐시하지 않음 (st.cache_data는 예외를 저장하지 않는다) → 다음 실행에서 재시도
+class _DegradedResult(Exception):
+    def __init__(self, out: dict):
+        super().__init__("degraded pipeline result")
+        self.out = out
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def _cached_pipeline(user_input: str, db_dir: str, allow_web: bool, prefer_ko: bool, manifest: str, _on_web=None) -> dict:
+    out = run_pipeline_two_step(user_input, db_dir=db_dir, allow_web=allow_web, prefer_ko=prefer_ko, on_web=_on_web)
+    if is_degraded_result(out):
+        raise _DegradedResult(out)
+    return out
+
+def _run_pipeline_cached(*args, **kwargs) -> dict:
+    try:
+        return _cached_pipeline(*args, **kwargs)
+    except _DegradedResult as e:
+        return e.out  # 이번 화면에는 그대로 표시하되 캐시에는 남기지 않음
+
+
 # ----------------------------
 # 세션 상태: 입력/옵션 기본값 (최초 1회만)
 # ----------------------------
@@ -48,6 +103,8 @@ with st.sidebar:
     st.caption("인덱싱 명령")
     st.code("python -m app.rag.ingest --pdf_dir ./data/pdfs --db_dir ./data/faiss_index --batch_size 32", language="bash")
 
+_warm_index(db_dir, manifest_fingerprint(db_dir))
+
 
 
 # 입력창: 고정 key로 세션 값 유지
@@ -69,56 +126,59 @@ if st.button("분석하기"):
     )
 
     with st.status("🔎 분석중...", expanded=True) as status:
-        # 1) 로컬 단계
-        local = run_pipeline_two_step(
+        # 로컬 단계 → (필요 시) 웹 단계: 웹 검색이 실제로 시작될 때 라벨을 갱신 (인위적 sleep 없음)
+        local = _run_pipeline_cached(
             user_input,
-            db_dir=db_dir,
-            allow_web=bool(st.session_state.get("allow_web", True)),
-            prefer_ko=st.session_state.get("prefer_ko", True),   # ✅ locale 전달
+            db_dir,
+            bool(st.session_state.get("allow_web", True)),
+            bool(st.session_state.get("prefer_ko", True)),   # ✅ locale 전달
+            manifest_fingerprint(db_dir),
+            _on_web=lambda: status.update(label="🌐 웹 검색중...", state="running"),
         )
-        if local.get("need_web"):
-            status.update(label="🌐 웹 검색중...", state="running")
-            time.sleep(1.0)  # 👈 1초만 잠시 보여줌 (streamlit이 바로 완료로 바꾸지 않게)
-            # 2) 이미 run_pipeline_two_step 안에서 웹까지 끝났음
-            #    (두 단계 수행 결과가 local 변수에 들어있음)
 
         # 완료
         status.update(label="✅ 완료", state="complete")
 
     # 결과 렌더링
     st.subheader("Root Causes(근본 원인)")
-    st.json(local.get("causes", {}))
+    causes = local.get("causes", {})
+    st.json(causes, expanded=len(str(causes)) <= _JSON_EXPAND_MAX_CHARS)
 
     st.subheader("Fix Guidance(해결 방안)")
-    st.markdown(local.get("solution_markdown", "") or "No guidance generated.")
+    solution_md = local.get("solution_markdown", "") or ""
+    if solution_md:
+        for sec in _split_sections(solution_md):
+            st.markdown(sec)
+    else:
+        st.markdown("No guidance generated.")
 
+    # 참고 목록은 항목별 호출 대신 한 문자열로 모아 st.markdown 1회
     st.subheader("Local Sources(로컬 문서 근거)")
     refs = local.get("references", []) or []
     if refs:
+        lines = []
         for ref in refs:
             rid = ref.get("rid", "")
             fn = ref.get("filename", "")
             pg = ref.get("page", "")
             suffix = f" (p.{pg})" if pg not in (None, "", 0) else ""
-            st.markdown(f"- **{rid}**: {fn}{suffix}")
+            lines.append(f"- **{rid}**: {fn}{suffix}")
+        st.markdown("\n".join(lines))
     else:
         # Fallback: retrieved_text에서 [R#] 헤더만 추출해 표시
-        import re
         retrieved_text = local.get("retrieved_text", "") or ""
-        headers = re.findall(r"^\[R(\d+)\]\s*(.+)$", retrieved_text, re.MULTILINE)
+        headers = _REF_HEADER_RE.findall(retrieved_text)
         if headers:
-            for num, line in headers[:10]:
-                st.markdown(f"- **R{num}**: {line}")
+            st.markdown("\n".join(f"- **R{num}**: {line}" for num, line in headers[:10]))
         else:
             st.write("로컬 문서 직접 근거 없음")
 
     st.subheader("Web Sources(웹 문서 근거)")
     web_refs = local.get("web_sources") or []
     if web_refs:
-        for r in web_refs:
-            st.markdown(f'- [{r.get("title","link")}]({r.get("url","")})')
+        st.markdown("\n".join(f'- [{r.get("title","link")}]({r.get("url","")})' for r in web_refs))
     else:
         if local.get("need_web"):
             st.write("웹 검색 시도됨(0건).")
         else:
-            st.write("로컬에서 해결됨(웹 폴백 불필요).")
\ No newline at end of file
+            st.write("로컬에서 해결됨(웹 폴백 불필요).")
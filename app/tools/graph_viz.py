@@ -1,8 +1,9 @@
 # app/tools/graph_viz.py
 from __future__ import annotations
-from typing import Tuple, Union, Callable
+from functools import lru_cache
+from typing import Tuple, Union, Callable, Optional
 from langgraph.graph import StateGraph, END
-import os, subprocess, tempfile, shutil
+import hashlib, json, os, subprocess, tempfile, shutil
 from app.agents import supervisor as sup
 
 # 리스트나 딕셔너리 등 여러 후보 중에서 “하나를 선택(pick)”하는 내부 유틸리티 함수
@@ -13,6 +14,14 @@ def _pick(cands: list[str], default: Callable = lambda s: s) -> tuple[Callable,
             return fn, name, True
     return default, cands[0], False
 
+# 노드 함수 탐색은 import 시 1회만 수행 (빌드마다 getattr 루프 반복 방지)
+_PICKED = {
+    "retrieve": _pick(["node_retrieve", "retrieve", "retrieve_node"]),
+    "analyze":  _pick(["node_analyze", "analyze", "analyze_node"]),
+    "write":    _pick(["node_write_solution","write_solution","node_solution","node_solution_writer","node_write"]),
+    "web":      _pick(["node_web_fallback","node_web_search","web_fallback","node_web"]),
+}
+
 # LangGraph의 StateGraph를 생성·설정·컴파일해서 실행 가능한 앱(app)을 만드는 내부 빌더 함수
 def _build_state_graph():
     AgentState = getattr(sup, "AgentState", None)
@@ -31,10 +40,10 @@ def _build_state_graph():
             web_refs: list = field(default_factory=list)
             web_result_count: int = 0
 
-    retrieve_fn, _, _ = _pick(["node_retrieve", "retrieve", "retrieve_node"])
-    analyze_fn,  _, _ = _pick(["node_analyze", "analyze", "analyze_node"])
-    write_fn,    _, has_write = _pick(["node_write_solution","write_solution","node_solution","node_solution_writer","node_write"])
-    web_fn,      _, has_web   = _pick(["node_web_fallback","node_web_search","web_fallback","node_web"])
+    retrieve_fn, _, _ = _PICKED["retrieve"]
+    analyze_fn,  _, _ = _PICKED["analyze"]
+    write_fn,    _, has_write = _PICKED["write"]
+    web_fn,      _, has_web   = _PICKED["web"]
 
     g = StateGraph(AgentState)
     g.add_node("retrieve", retrieve_fn)
@@ -55,7 +64,33 @@ def _build_state_graph():
     g.add_edge("write_solution", END)
     return g
 
+# 컴파일된 그래프와 그 Mermaid/PNG 결과는 결정적이므로 프로세스당 1회만 생성
+@lru_cache(maxsize=1)
+def _get_compiled_graph():
+    return _build_state_graph().compile()
+
+@lru_cache(maxsize=1)
+def _mermaid_src() -> str:
+    return _get_compiled_graph().get_graph().draw_mermaid()
+
+# LangGraph 내장 PNG 렌더링 (mermaid.ink 네트워크 호출) — 성공한 PNG 바이트만 캐시.
+# 타임아웃/DNS 실패 등은 캐시하지 않아 다음 호출에서 다시 시도한다.
+_BUILTIN_PNG: Optional[bytes] = None
+
+def _builtin_png() -> Tuple[Optional[bytes], str]:
+    global _BUILTIN_PNG
+    if _BUILTIN_PNG is not None:
+        return _BUILTIN_PNG, ""
+    try:
+        png = _get_compiled_graph().get_graph().draw_mermaid_png() or None
+    except Exception as e:
+        return None, repr(e)
+    if png:
+        _BUILTIN_PNG = png
+    return png, ""
+
 # Mermaid CLI 실행 파일(mmdc)의 위치를 찾아 반환하는 내부 헬퍼
+@lru_cache(maxsize=1)
 def _find_mmdc_path() -> str | None:
     """
     Windows에서는 보통 %AppData%\\npm\\mmdc.cmd
@@ -87,8 +122,28 @@ def _find_mmdc_path() -> str | None:
             return cand
     return None
 
+# mmdc 결과 PNG 디스크 캐시: 같은 Mermaid 소스면 Chromium을 다시 띄우지 않고 파일만 읽는다
+_CACHE_DIR = os.getenv("GRAPH_VIZ_CACHE_DIR", os.path.join(tempfile.gettempdir(), "graph_viz_cache"))
+
+def _puppeteer_config() -> str:
+    # headless Chromium 기동 옵션 (--no-sandbox: 컨테이너/CI에서 샌드박스 초기화 비용·실패 회피)
+    path = os.path.join(_CACHE_DIR, "puppeteer-config.json")
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"args": ["--no-sandbox"]}, f)
+        os.replace(tmp, path)
+    return path
+
 # _find_mmdc_path가 찾은 Mermaid CLI(mmdc)를 실제로 실행해, Mermaid 코드(.mmd)를 PNG 이미지로 렌더링(render) 하는 함수
 def _render_png_via_mmdc(mermaid_src: str) -> bytes | None:
+    key = hashlib.sha256(mermaid_src.encode("utf-8")).hexdigest()
+    cached = os.path.join(_CACHE_DIR, key + ".png")
+    try:
+        with open(cached, "rb") as f:
+            return f.read()
+    except OSError:
+        pass
     mmdc = _find_mmdc_path()
     if not mmdc:
         print("[graph_viz] mmdc not found in PATH. Install with: npm i -g @mermaid-js/mermaid-cli@10")
@@ -99,29 +154,39 @@ def _render_png_via_mmdc(mermaid_src: str) -> bytes | None:
         with open(mmd, "w", encoding="utf-8") as f:
             f.write(mermaid_src)
         try:
-            subprocess.run([mmdc, "-i", mmd, "-o", out, "-b", "transparent"], check=True, capture_output=True, text=True)
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            subprocess.run(
+                [mmdc, "-i", mmd, "-o", out, "-b", "transparent", "--quiet", "-p", _puppeteer_config()],
+                check=True, capture_output=True, text=True,
+            )
             with open(out, "rb") as f:
-                return f.read()
+                png = f.read()
         except subprocess.CalledProcessError as e:
             print("[graph_viz] mmdc failed:", e.stderr or e.stdout)
+            return None
         except Exception as e:
             print("[graph_viz] mmdc exception:", repr(e))
-    return None
+            return None
+    # 원자적 저장 (tmp → os.replace): 동시 실행 시에도 반쯤 쓰인 PNG를 읽지 않게. 저장 실패는 무시
+    try:
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(png)
+        os.replace(tmp, cached)
+    except OSError:
+        pass
+    return png
 
 # LangGraph나 Mermaid 다이어그램을 PNG 이미지 또는 Mermaid 원본(.mmd) 파일로 내보내는(export) 기능을 담당하는 유틸리티 함수
 def export_png_or_mermaid(debug: bool=False) -> Tuple[str, Union[bytes, str]]:
-    g = _build_state_graph()
-    compiled = g.compile()
     # 1) LangGraph 내장 PNG 시도
-    try:
-        png = compiled.get_graph().draw_mermaid_png()
-        if png:
-            if debug: print("[graph_viz] built-in PNG OK")
-            return "png", png
-    except Exception as e:
-        if debug: print("[graph_viz] built-in PNG failed:", repr(e))
+    png, err = _builtin_png()
+    if png:
+        if debug: print("[graph_viz] built-in PNG OK")
+        return "png", png
+    if debug and err: print("[graph_viz] built-in PNG failed:", err)
     # 2) mmdc 폴백
-    mermaid_src = compiled.get_graph().draw_mermaid()
+    mermaid_src = _mermaid_src()
     png2 = _render_png_via_mmdc(mermaid_src)
     if png2:
         if debug: print("[graph_viz] mmdc PNG OK")
@@ -1,50 +1,155 @@
 # app/web/search.py
 from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import itertools
 from typing import List, Dict, Optional, Tuple
 import os
-import re
+import threading
+import time
 
-from urllib.parse import urlparse, parse_qs, unquote
+from urllib.parse import ParseResult, urlparse, parse_qs, unquote
+
+from ..common.patterns import find_ora_code
 
 STRICT_ORA_MATCH = (os.getenv("STRICT_ORA_MATCH", "true").lower() == "true")
 
 # 입력 문자열(text)에서 Oracle 오류 코드(예: ORA-12514)를 찾아내는 내부 유틸리티 함수
+# (로컬 검색/분석과 같은 공용 패턴 사용 → 같은 입력이면 웹/로컬이 같은 코드로 판정, 결과는 대문자)
 def _extract_ora_code(text: str) -> str | None:
-    if not text:
-        return None
-    m = re.search(r"\bORA-\d{5}\b", text.upper())
-    return m.group(0) if m else None
+    return find_ora_code(text)
 
 # 웹 검색 결과(hit) 가 특정 Oracle 에러 코드(예: ORA-12514)를 실제로 포함하고 있는지 여부를 검사하는 함수
-def _hit_contains_code(code: str, *, url: str = "", title: str = "", text: str = "", snippet: str = "") -> bool:
-    """결과(본문/제목/URL/스니펫)에 ORA-코드가 실제로 포함되는지 검사"""
+def _hit_contains_code(code: str, *, url: str = "", title: str = "", text: str = "", snippet: str = "",
+                       head_upper: Tuple[str, ...] = ()) -> bool:
+    """결과(본문/제목/URL/스니펫)에 ORA-코드가 실제로 포함되는지 검사 (code는 대문자)"""
     if not code:
         return True
-    hay = " ".join([url or "", title or "", text or "", snippet or ""]).upper()
-    return code in hay
+    # 짧은 필드(URL/제목/스니펫)를 먼저 보고, 큰 본문은 마지막에만 검사 (첫 일치에서 중단)
+    for s in (head_upper or (url.upper(), title.upper(), snippet.upper())):
+        if code in s:
+            return True
+    return bool(text) and code in text.upper()
 
 # DuckDuckGo(DDG) 검색 결과 URL이 중간 리디렉션(https://duckduckgo.com/l/?uddg=...)으로 감싸져 있을 때, 그 실제 원본 URL을 추출(unwrap) 하는 내부 유틸리티 함수
-def _unwrap_ddg_redirect(href: str) -> str:
+@lru_cache(maxsize=2048)
+def _unwrap_ddg_redirect(href: str) -> Tuple[str, Optional[ParseResult]]:
     """
     DDG HTML 검색 결과의 redirect 링크(duckduckgo.com/l/?uddg=...)를 실제 목적지로 풀어준다.
     redirect가 아니면 원본 href를 그대로 반환.
+    반환: (url, url의 파싱 결과) — 호출측 _host_ok가 같은 URL을 다시 파싱하지 않도록 함께 넘긴다.
+    DDG는 반복 SERP에서 같은 redirect URL을 재발급하므로 결과(unquote 포함)를 캐시한다.
     """
     try:
         if not href:
-            return href
+            return href, None
         u = urlparse(href)
         if (u.hostname or "").lower().endswith("duckduckgo.com") and u.path.startswith("/l/"):
             qs = parse_qs(u.query or "")
             if "uddg" in qs and qs["uddg"]:
-                return unquote(qs["uddg"][0])
-        return href
+                dest = unquote(qs["uddg"][0])
+                return dest, urlparse(dest)
+        return href, u
     except Exception:
-        return href
-    
+        return href, None
+
 # ---- 환경 플래그 ----
 WEB_SEARCH_BACKEND = (os.getenv("WEB_SEARCH_BACKEND") or "").lower().strip()  # ddgs | duckduckgo_search | html | ""
 INSECURE_SKIP_VERIFY = (os.getenv("INSECURE_SKIP_VERIFY", "false").lower() == "true")
 CA_BUNDLE = os.getenv("REQUESTS_CA_BUNDLE") or os.getenv("SSL_CERT_FILE")  # 있으면 requests verify에 사용
+_VERIFY = False if INSECURE_SKIP_VERIFY else (CA_BUNDLE or True)
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Language": "en-US,en;q=0.9"}
+# brotli 디코더가 있으면 br 협상 (docs.oracle.com 등은 br로 전송량이 더 작음)
+try:
+    import brotli  # noqa: F401
+    DEFAULT_HEADERS["Accept-Encoding"] = "gzip, deflate, br"
+except Exception:
+    pass
+HTTP_TIMEOUT = 12
+# 응답 본문 상한(바이트, 압축 해제 후) — 수 MB 페이지도 앞부분만 스트리밍으로 읽는다
+WEB_MAX_BODY_BYTES = int(os.getenv("WEB_MAX_BODY_BYTES", "524288"))
+
+# ---- 공유 HTTP 세션 (keep-alive + 커넥션 풀 + 재시도) ----
+# URL마다 requests.get을 새로 부르면 TCP/TLS 핸드셰이크를 매번 다시 한다 → 세션 1개를 스레드 간 공유
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+def _get_session():
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                sess = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=32, pool_maxsize=32,
+                    # 연결 실패/502·503·504만 재시도. read=0: 읽기 타임아웃은 재시도하지 않아
+                    # 느린 URL 하나가 fetch 워커를 HTTP_TIMEOUT 이상 붙잡지 않게 한다
+                    max_retries=Retry(total=2, connect=2, read=0, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+                )
+                sess.mount("https://", adapter)
+                sess.mount("http://", adapter)
+                sess.headers.update(DEFAULT_HEADERS)
+                _SESSION = sess
+    return _SESSION
+
+# 공유 세션으로 HTML을 받아오는 함수 (200이 아니거나 실패하면 None, 본문은 WEB_MAX_BODY_BYTES까지만)
+def _http_get_text(url: str, params: Optional[Dict[str, str]] = None) -> Optional[str]:
+    try:
+        with _get_session().get(url, params=params, timeout=HTTP_TIMEOUT, verify=_VERIFY, stream=True) as r:
+            if r.status_code != 200:
+                return None
+            buf = bytearray()
+            for chunk in r.iter_content(chunk_size=65536):
+                buf += chunk
+                if len(buf) >= WEB_MAX_BODY_BYTES:
+                    break
+            return bytes(buf[:WEB_MAX_BODY_BYTES]).decode(r.encoding or "utf-8", errors="replace")
+    except Exception:
+        return None
+
+# ---- DDG HTML SERP 전용 클라이언트 (httpx, h2 설치 시 HTTP/2) ----
+# 병렬 검색 스레드들의 SERP 요청이 html.duckduckgo.com 한 커넥션 위로 다중화된다 (httpx.Client는 스레드 안전)
+_SERP_URL = "https://html.duckduckgo.com/html/"
+_SERP_CLIENT = None
+_SERP_CLIENT_LOCK = threading.Lock()
+
+def _get_serp_client():
+    # httpx 미설치/초기화 실패 시 None → requests 세션 경로 사용
+    global _SERP_CLIENT
+    if _SERP_CLIENT is None:
+        with _SERP_CLIENT_LOCK:
+            if _SERP_CLIENT is None:
+                try:
+                    import httpx
+                    try:
+                        import h2  # noqa: F401
+                        http2 = True
+                    except Exception:
+                        http2 = False
+                    _SERP_CLIENT = httpx.Client(
+                        http2=http2, verify=_VERIFY, timeout=HTTP_TIMEOUT,
+                        headers=DEFAULT_HEADERS, follow_redirects=True,
+                        limits=httpx.Limits(max_connections=WEB_SEARCH_WORKERS, max_keepalive_connections=WEB_SEARCH_WORKERS),
+                    )
+                except Exception:
+                    _SERP_CLIENT = False
+    return _SERP_CLIENT or None
+
+def _serp_get_text(params: Dict[str, str]) -> Optional[str]:
+    client = _get_serp_client()
+    if client is None:
+        return _http_get_text(_SERP_URL, params=params)
+    try:
+        r = client.get(_SERP_URL, params=params)
+    except Exception:
+        return None
+    if r.status_code != 200:
+        return None
+    return r.text
 
 # ---- 우선순위: ddgs(9.x) -> duckduckgo_search(6.x) -> html 파서 ----
 _have_ddgs = False
@@ -69,6 +174,11 @@ else:
     except Exception:
         pass
 
+# 본문 추출기 (선택): 자체 fetch_url은 쓰지 않고 공유 세션으로 받은 HTML만 전달
+try:
+    import trafilatura
+except Exception:
+    trafilatura = None
 
 # ---- Allowlist (그대로 유지) ----
 _ALLOWED = {
@@ -84,43 +194,73 @@ _ALLOWED = {
     "blogspot.com",
 }
 
+# 허용 도메인 자체 또는 그 서브도메인(*.oracle.com 등) — str.endswith에 튜플로 한 번에 전달
+_ALLOWED_SUFFIXES = tuple("." + d for d in sorted(_ALLOWED))
+
+# 호스트명 기준 허용 여부 (URL보다 호스트명이 훨씬 자주 반복되므로 호스트 단위로 캐시)
+@lru_cache(maxsize=4096)
+def _host_allowed(host: str) -> bool:
+    return host in _ALLOWED or host.endswith(_ALLOWED_SUFFIXES)
+
 # 주어진 URL의 호스트(host, 도메인) 가 허용 가능한(“신뢰할 수 있는”) 도메인인지 검사하는 내부 함수
-def _host_ok(url: str) -> bool:
-    from urllib.parse import urlparse
-    host = (urlparse(url).hostname or "").lower()
-#    return any(host.endswith(d) for d in _ALLOWED)
-    # *.oracle.com 전체 허용 + 나머지는 endswith 체크
-    return (
-        host.endswith(".oracle.com") or host == "oracle.com" or
-        any(host.endswith(d) for d in _ALLOWED)
-    )
+# (이미 파싱된 ParseResult를 받으면 재파싱 없이 사용)
+def _host_ok(url: "str | ParseResult") -> bool:
+    parsed = url if isinstance(url, ParseResult) else urlparse(url)
+    return _host_allowed((parsed.hostname or "").lower())
 
 MIN_LEN_PRIMARY   = 220
 MIN_LEN_SECONDARY = 60
 
+# ---- 동시성 (네트워크 I/O 바운드 → 스레드 풀로 대기 시간 겹치기) ----
+WEB_FETCH_WORKERS = int(os.getenv("WEB_FETCH_WORKERS", "16"))
+WEB_SEARCH_WORKERS = int(os.getenv("WEB_SEARCH_WORKERS", "8"))
+# duckduckgo.com 동시 요청 상한 (프로세스 전역, 여러 사용자 요청이 겹쳐도 유지)
+_DDG_SEM = threading.Semaphore(int(os.getenv("WEB_SEARCH_CONCURRENCY", "8")))
+
 # ---- HTML 파서 백업 (requests + BeautifulSoup; verify/프록시 자동) ----
+# C 확장 lxml이 있으면 사용, 없으면 순수 파이썬 html.parser
+try:
+    import lxml  # noqa: F401
+    _BS_PARSER = "lxml"
+except Exception:
+    _BS_PARSER = "html.parser"
+
+# 본문 후보 영역 (bs4/selectolax 공통 CSS 선택자)
+_MAIN_SELECTORS = ("article", "[role=main]", "main", ".content", "#content")
+
+def _longest_main_text(select, text_of, whole) -> str:
+    """_MAIN_SELECTORS 후보 중 가장 긴 본문 (정렬 없이 1-pass max). 후보가 없으면 문서 전체 텍스트."""
+    best = ""
+    # article이 충분히 길면 나머지 선택자는 보지 않고 바로 채택 (docs.oracle.com 일반 케이스)
+    for node in select("article"):
+        txt = text_of(node)
+        if len(txt) > MIN_LEN_PRIMARY:
+            return txt
+        if len(txt) > len(best):
+            best = txt
+    rest = (text_of(node) for sel in _MAIN_SELECTORS[1:] for node in select(sel))
+    best = max(itertools.chain((best,), rest), key=len)
+    return best or whole()
+
 # 웹 검색을 한 번 수행해서(once) 그 결과를 HTML 형태로 가져오는 함수
 def _search_once_html(query: str, max_results: int = 6, region: str = "wt-wt") -> List[Dict[str, str]]:
     items: List[Dict[str, str]] = []
     try:
-        import requests
-        from bs4 import BeautifulSoup
+        from bs4 import BeautifulSoup, SoupStrainer
     except Exception:
         return items
     params = {"q": query, "kl": region}
-    headers = {"User-Agent": "Mozilla/5.0", "Accept-Language": "en-US,en;q=0.9"}
-    verify = False if INSECURE_SKIP_VERIFY else (CA_BUNDLE or True)
     try:
-        r = requests.get("https://html.duckduckgo.com/html/", params=params, headers=headers,
-                         timeout=12, verify=verify)
-        if r.status_code != 200:
+        html = _serp_get_text(params)
+        if html is None:
             return items
-        soup = BeautifulSoup(r.text, "html.parser")
+        # 결과 링크(a.result__a)만 트리로 만들고 나머지 서브트리는 건너뜀
+        soup = BeautifulSoup(html, _BS_PARSER, parse_only=SoupStrainer("a", class_="result__a"))
         for a in soup.select("a.result__a"):
             href_raw = (a.get("href") or "").strip()
-            url = _unwrap_ddg_redirect(href_raw)  # ✅ 리다이렉트 해제
+            url, parsed = _unwrap_ddg_redirect(href_raw)  # ✅ 리다이렉트 해제 (+ 파싱 결과 재사용)
             title = (a.get_text(strip=True) or url)
-            if not url or not _host_ok(url):
+            if not url or parsed is None or not _host_ok(parsed):
                 continue
             items.append({"title": title, "url": url, "snippet": ""})
             if len(items) >= max_results:
@@ -130,47 +270,151 @@ def _search_once_html(query: str, max_results: int = 6, region: str = "wt-wt") -
     return items
 
 # 웹페이지를 가져(fetch) 와서, 그중 사람이 읽을 수 있는(본문 중심의) 텍스트만 추출(readable) 하는 함수
-def _fetch_readable(url: str) -> Optional[str]:
-    # trafilatura 우선 (내부 requests 사용 시 CA_BUNDLE/프록시 자동 반영)
+def _fetch_readable_uncached(url: str) -> Optional[str]:
+    # 공유 세션으로 1회만 다운로드(verify/CA_BUNDLE 반영) → trafilatura 추출, 실패 시 같은 HTML로 bs4 백업
     try:
-        import trafilatura
-        # trafilatura는 verify 인자를 직접 받지 않지만, 내부 요청은 시스템 CA/프록시 환경을 따릅니다.
-        downloaded = trafilatura.fetch_url(url, timeout=12)
-        if downloaded:
-            text = trafilatura.extract(downloaded, include_comments=False, include_tables=False)
+        html = _http_get_text(url)
+    except Exception:
+        return None
+    if not html:
+        return None
+    # trafilatura 우선 (자체 fetcher 대신 받아둔 HTML만 전달) — 실패해도 같은 HTML로 백업 추출, 재다운로드 없음
+    if trafilatura is not None:
+        try:
+            text = trafilatura.extract(html, include_comments=False, include_tables=False)
             if text and text.strip():
                 return text.strip()
+        except Exception:
+            pass
+    # selectolax(C 기반) 백업 → 없으면 bs4 백업
+    txt = _readable_via_selectolax(html)
+    if txt is not None:
+        return txt or None
+    return _readable_via_bs4(html)
+
+def _readable_via_selectolax(html: str) -> Optional[str]:
+    # 미설치/파싱 실패 시 None (→ bs4로 넘어감), 성공 시 본문 문자열(빈 문자열 가능)
+    try:
+        from selectolax.parser import HTMLParser
     except Exception:
-        pass
-    # requests + bs4 백업 (verify 제어)
+        return None
+    try:
+        tree = HTMLParser(html)
+        tree.strip_tags(["script", "style", "noscript"])
+        root = tree.body or tree.root
+        txt = _longest_main_text(
+            tree.css,
+            lambda node: node.text(separator="\n", strip=True),
+            lambda: root.text(separator="\n", strip=True) if root else "",
+        )
+        return txt.strip()
+    except Exception:
+        return None
+
+def _readable_via_bs4(html: str) -> Optional[str]:
     try:
-        import requests
         from bs4 import BeautifulSoup
     except Exception:
         return None
-    headers = {"User-Agent": "Mozilla/5.0", "Accept-Language": "en-US,en;q=0.9"}
-    verify = False if INSECURE_SKIP_VERIFY else (CA_BUNDLE or True)
     try:
-        r = requests.get(url, headers=headers, timeout=12, verify=verify)
-        if r.status_code != 200:
-            return None
-        soup = BeautifulSoup(r.text, "html.parser")
+        soup = BeautifulSoup(html, _BS_PARSER)
         for t in soup(["script", "style", "noscript"]):
             t.decompose()
-        cands = []
-        for sel in ("article", "[role=main]", "main", ".content", "#content"):
-            for node in soup.select(sel):
-                txt = node.get_text("\n", strip=True)
-                if txt:
-                    cands.append(txt)
-        if not cands:
-            cands.append(soup.get_text("\n", strip=True))
-        cands.sort(key=len, reverse=True)
-        txt = cands[0] if cands else ""
+        txt = _longest_main_text(
+            soup.select,
+            lambda node: node.get_text("\n", strip=True),
+            lambda: soup.get_text("\n", strip=True),
+        )
         return txt.strip() or None
     except Exception:
         return None
 
+# ---- 본문 추출 캐시 (메모리 LRU + 디스크 TTL) ----
+# 같은 Oracle 문서 페이지는 다음 질의/재시도 패스에서도 다시 fetch되므로 URL 기준으로 캐시
+WEB_CACHE_ENABLED = (os.getenv("WEB_CACHE_ENABLED", "true").lower() == "true")
+WEB_CACHE_DIR = os.getenv("WEB_CACHE_DIR", "./data/.web_cache")  # 빈 값이면 디스크 계층 끔
+WEB_CACHE_TTL = int(os.getenv("WEB_CACHE_TTL", "86400"))
+
+def _extractor_version() -> str:
+    # 추출기 버전이 바뀌면 키 prefix가 달라져 디스크 캐시가 자동 무효화
+    try:
+        from importlib.metadata import version
+        return version("trafilatura")
+    except Exception:
+        return "none"
+
+_WEB_CACHE_PREFIX = f"readable:v1:{_extractor_version()}:"
+_WEB_DISK = None
+_WEB_DISK_LOCK = threading.Lock()
+
+def _web_disk_cache():
+    global _WEB_DISK
+    if _WEB_DISK is None and WEB_CACHE_DIR:
+        with _WEB_DISK_LOCK:
+            if _WEB_DISK is None:
+                try:
+                    import diskcache  # SQLite 기반 디스크 캐시 (선택)
+                    _WEB_DISK = diskcache.Cache(WEB_CACHE_DIR)
+                except Exception:
+                    _WEB_DISK = False  # 미설치/초기화 실패 → 메모리만 사용
+    return _WEB_DISK or None
+
+# 메모리 계층: url → (생성 시각, 본문) LRU. 디스크 계층과 같은 WEB_CACHE_TTL로 만료
+WEB_CACHE_MEM_MAX = 512
+_WEB_MEM: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_WEB_MEM_LOCK = threading.Lock()
+
+def _web_fresh(created: float) -> bool:
+    return WEB_CACHE_TTL <= 0 or (time.time() - created) < WEB_CACHE_TTL
+
+def _web_mem_get(url: str) -> Optional[str]:
+    with _WEB_MEM_LOCK:
+        hit = _WEB_MEM.get(url)
+        if hit is None:
+            return None
+        if not _web_fresh(hit[0]):
+            del _WEB_MEM[url]
+            return None
+        _WEB_MEM.move_to_end(url)
+        return hit[1]
+
+def _web_mem_put(url: str, text: str, created: float) -> None:
+    with _WEB_MEM_LOCK:
+        _WEB_MEM[url] = (created, text)
+        _WEB_MEM.move_to_end(url)
+        while len(_WEB_MEM) > WEB_CACHE_MEM_MAX:
+            _WEB_MEM.popitem(last=False)
+
+# 캐시 경유 본문 추출 (성공한 결과만 메모리/디스크에 저장 → 일시적 실패는 다음 호출에서 재시도)
+def _fetch_readable(url: str) -> Optional[str]:
+    if not WEB_CACHE_ENABLED:
+        return _fetch_readable_uncached(url)
+    hit = _web_mem_get(url)
+    if hit is not None:
+        return hit
+    disk = _web_disk_cache()
+    key = _WEB_CACHE_PREFIX + url
+    if disk is not None:
+        try:
+            text, expire_at = disk.get(key, expire_time=True)
+        except Exception:
+            text, expire_at = None, None
+        if text is not None:
+            # 디스크 적중 → 메모리 승격. 생성 시각을 디스크 만료 시각에서 역산해 TTL이 연장되지 않게
+            created = (expire_at - WEB_CACHE_TTL) if (expire_at and WEB_CACHE_TTL > 0) else time.time()
+            _web_mem_put(url, text, created)
+            return text
+    text = _fetch_readable_uncached(url)
+    if not text:
+        return None
+    _web_mem_put(url, text, time.time())
+    if disk is not None:
+        try:
+            disk.set(key, text, expire=WEB_CACHE_TTL or None)
+        except Exception:
+            pass
+    return text
+
 # 웹 검색을 한 번 수행하는 핵심 함수
 def _search_once(query: str, max_results: int = 6, region: str = "wt-wt") -> List[Dict[str, str]]:
     """
@@ -252,11 +496,12 @@ def _search_once(query: str, max_results: int = 6, region: str = "wt-wt") -> Lis
     return _search_once_html(query, max_results, region)
 
 # 웹 검색에 사용할 쿼리(query) 문자열들을 자동 생성하는 함수
-def _build_queries(user_query: str) -> List[str]:
+# 같은 입력은 항상 같은 쿼리 집합 → 입력 문자열 기준으로 메모이즈 (불변 튜플로 캐시해 공유 안전)
+@lru_cache(maxsize=256)
+def _build_queries_cached(user_query: str) -> Tuple[str, ...]:
     qs = [user_query]
-    m = re.search(r"(ORA-\d{5})", (user_query or "").upper())
-    if m:
-        code  = m.group(1)
+    code = find_ora_code(user_query)
+    if code:
         short = code[:8]
         qs += [
             f'"{code}"',                            # 정확 매칭
@@ -276,38 +521,103 @@ def _build_queries(user_query: str) -> List[str]:
             f'{user_query} site:docs.oracle.com',
             f'{user_query} Oracle error',
         ]
-    seen, out = set(), []
-    for q in qs:
-        if q not in seen:
-            out.append(q); seen.add(q)
-    return out
+    return tuple(dict.fromkeys(qs))  # 순서 유지 중복 제거
+
+def _build_queries(user_query: str) -> List[str]:
+    return list(_build_queries_cached(user_query))
+
+# 검색 엔진 호출을 전역 세마포어로 감싼 함수 (DDG에 과도한 동시 요청 방지)
+def _search_once_guarded(query: str, max_results: int) -> List[Dict[str, str]]:
+    with _DDG_SEM:
+        return _search_once(query, max_results=max_results, region="wt-wt")
+
+# 여러 쿼리를 병렬로 검색해 쿼리 순서대로 결과 목록을 돌려주는 함수
+def _search_all(queries: List[str], max_results: int) -> List[List[Dict[str, str]]]:
+    if not queries:
+        return []
+    with ThreadPoolExecutor(max_workers=min(WEB_SEARCH_WORKERS, len(queries))) as ex:
+        per_query = list(ex.map(lambda q: _search_once_guarded(q, max_results), queries))
+    # 코드 필터용 대문자 사본(URL/제목/스니펫)을 hit 수집 시 1회만 생성
+    for items in per_query:
+        for item in items:
+            item["head_upper"] = (item["url"].upper(), (item.get("title") or "").upper(),
+                                  (item.get("snippet") or "").upper())
+    return per_query
+
+# 중복 제거된 URL들의 본문을 병렬로 가져오는 함수 (url → text|None)
+def _fetch_all(urls: List[str]) -> Dict[str, Optional[str]]:
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(WEB_FETCH_WORKERS, len(urls))) as ex:
+        return dict(zip(urls, ex.map(_fetch_readable, urls)))
+
+# 엄격 매칭에서 스니펫이 있는데도 URL/제목/스니펫에 코드가 없으면 본문을 받아도 버려질 가능성이 높으므로 fetch 생략
+# (스니펫이 비어 있으면 본문 없이 판단할 수 없으므로 fetch)
+def _needs_body(item: Dict, code: str | None) -> bool:
+    if not (STRICT_ORA_MATCH and code) or not item.get("snippet"):
+        return True
+    return _hit_contains_code(code, head_upper=item["head_upper"])
+
+# 검색 hit 1건을 (본문 포함) 수집 항목으로 바꾸는 함수. 버려야 하면 None
+def _accept_hit(item: Dict, text: Optional[str], min_len: int, code: str | None) -> Optional[Dict[str, str]]:
+    url = item["url"]
+    snippet = item.get("snippet") or ""
+    title = item.get("title") or ""
+    # 🔒 엄격 매칭: ORA 코드가 본문/제목/URL/스니펫 어디에도 없으면 버림
+    if STRICT_ORA_MATCH and code:
+        if not _hit_contains_code(code, text=(text or ""), head_upper=item["head_upper"]):
+            return None
+    # 길이컷 (짧아도 스니펫이 있으면 수용)
+    if text and len(text) > min_len:
+        return {"title": title or url, "url": url, "text": text}
+    if text:
+        return {"title": title or url, "url": url, "text": text}
+    if snippet:
+        return {"title": title or url, "url": url, "text": snippet}
+    return None
 
 # 여러 검색 결과나 처리 결과를 “모아(collect)” 하나의 리스트나 딕셔너리 형태로 정리하는 내부 유틸리티 함수
 def _collect(queries: List[str], min_len: int, max_results: int = 6, *, code: str | None = None) -> List[Dict[str, str]]:
+    # 검색: 쿼리 1개로 시작해 할당량이 안 찼을 때만 배치를 2배씩(최대 WEB_SEARCH_WORKERS) 늘려 병렬 검색.
+    # fetch: 결과 순서대로 '남은 빈칸 수'만큼의 URL만 한 wave로 병렬 fetch → 필터/병합 → 부족하면 다음 wave.
+    # max_results개가 모이면 남은 검색/fetch는 수행하지 않는다 (첫 쿼리 결과로 채워지면 검색 1회 + fetch ~max_results회).
     collected: List[Dict[str, str]] = []
     seen_urls = set()
-    for q in queries:
-        for item in _search_once(q, max_results=max_results, region="wt-wt"):
-            url = item["url"]
-            if url in seen_urls:
-                continue
-            text = _fetch_readable(url)
-            snippet = item.get("snippet") or ""
-            title = item.get("title") or ""
-            # 🔒 엄격 매칭: ORA 코드가 본문/제목/URL/스니펫 어디에도 없으면 버림
-            if STRICT_ORA_MATCH and code:
-                if not _hit_contains_code(code, url=url, title=title, text=(text or ""), snippet=snippet):
+    texts: Dict[str, Optional[str]] = {}
+    step = max(WEB_SEARCH_WORKERS, 1)
+    i, batch = 0, 1
+    while i < len(queries) and len(collected) < max_results:
+        chunk = queries[i:i + batch]
+        i += len(chunk)
+        batch = min(batch * 2, step)
+        per_query = _search_all(chunk, max(max_results - len(collected), 1))
+        pending = [item for items in per_query for item in items]
+
+        pos = 0
+        while pos < len(pending) and len(collected) < max_results:
+            need = max_results - len(collected)
+            # 싼 조건(이미 채택/이미 fetch/스니펫에 코드 없음) 먼저 → 살아남은 URL만 `need`개까지 이번 wave에서 다운로드
+            wave: List[Dict] = []
+            urls: List[str] = []
+            while pos < len(pending) and len(urls) < need:
+                item = pending[pos]
+                pos += 1
+                wave.append(item)
+                u = item["url"]
+                if u not in texts and u not in seen_urls and u not in urls and _needs_body(item, code):
+                    urls.append(u)
+            texts.update(_fetch_all(urls))
+
+            for item in wave:
+                url = item["url"]
+                if url in seen_urls:
                     continue
-            # 길이컷 (짧아도 스니펫이 있으면 수용)
-            if text and len(text) > min_len:
-                collected.append({"title": title or url, "url": url, "text": text})
-                seen_urls.add(url)
-            elif text:
-                collected.append({"title": title or url, "url": url, "text": text})
-                seen_urls.add(url)
-            elif snippet:
-                collected.append({"title": title or url, "url": url, "text": snippet})
-                seen_urls.add(url)
+                hit = _accept_hit(item, texts.get(url), min_len, code)
+                if hit is not None:
+                    collected.append(hit)
+                    seen_urls.add(url)
+                    if len(collected) >= max_results:
+                        return collected
     return collected
 
 # 웹 검색을 “안전하게(safely)” 수행하는 함수
@@ -320,8 +630,4 @@ def search_web_safely(user_query: str, max_results: int = 6) -> Tuple[List[Dict[
         return primary, queries
 
     secondary = _collect(queries, min_len=MIN_LEN_SECONDARY, max_results=max_results, code=code)
-    if secondary:
-        return secondary, queries
-
-    tertiary = _collect(queries, min_len=MIN_LEN_SECONDARY, max_results=max_results, code=code)
-    return tertiary, queries
+    return secondary, queries